@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+from __future__ import print_function
+import os
+import sys
+import threading
+import time
+import click
+from multiprocessing.pool import ThreadPool
+from economicpy.profiling import Profiler
+from run import get_dates, get_configuration, export
+
+
+@click.command()
+@click.argument('users', type=click.Path(exists=True))
+@click.option('--workers', default=8, help='Maximum number of users exported at the same time.')
+@click.option('--dry-run', is_flag=True, default=False, help='Simulated run without creating new entries.')
+@click.option('--date', default=None, help='Date in format YYYY-MM-DD for which data should be used.')
+@click.option('--since', default=None, help='First day (YYYY-MM-DD) of date range to be exported.')
+@click.option('--until', default=None, help='Last day (YYYY-MM-DD) of date range to be exported, defaults to today.')
+@click.option('--profile', default=None, help='File CPU profile (pstats) of all exports is written to.')
+@click.option('--profile-top', default=25, help='Number of hottest functions printed after profiled run.')
+@click.option('--trace-memory', is_flag=True, default=False,
+              help='Take memory snapshots after login, calendar fetch, JIRA and submission (requires --profile).')
+def batch(users, workers=8, dry_run=False, date=None, since=None, until=None, profile=None, profile_top=25,
+          trace_memory=False):
+    """
+    Export data to e-conomic for many users at once.
+
+    USERS is either directory with one subdirectory (containing config.ini
+    and calendar credentials) per user or manifest file listing such directories.
+
+    :param users: path to users directory or manifest file
+    :param workers: maximum number of users exported at the same time
+    :param dry_run: Simulated run without creating new entries in e-conomic
+    :param date: date in format YYYY-MM-DD
+    :param since: first day of date range in format YYYY-MM-DD
+    :param until: last day of date range in format YYYY-MM-DD
+    :param profile: path of file with CPU profile
+    :param profile_top: number of hottest functions printed after profiled run
+    :param trace_memory: whether memory snapshots should be taken at phase boundaries
+    """
+    if date and (since or until):
+        sys.exit("Option --date can't be used together with --since/--until")
+    if trace_memory and not profile:
+        sys.exit("Option --trace-memory can be used only together with --profile")
+    try:
+        dates = get_dates(date, since, until)
+    except ValueError:
+        sys.exit("Incorrect date format used. Expected: YYYY-MM-DD")
+    if not dates:
+        sys.exit("Incorrect date range used: --since is after --until")
+
+    user_dirs = get_user_dirs(users)
+    if not user_dirs:
+        sys.exit("No user configuration found in %s" % users)
+    if dry_run:
+        print("This is just dry run, no changes will be made.")
+
+    src_path = os.path.abspath(os.path.dirname(__file__))
+    profiler = Profiler(profile, profile_top, trace_memory) if profile else None
+    if profiler:
+        profiler.start()
+    pool = ThreadPool(max(1, min(workers, len(user_dirs))))
+    try:
+        with UserOutput(sys.stdout) as output:
+            results = pool.map(lambda user_dir: output.call(get_user_name(user_dir), export_user, src_path, user_dir,
+                                                            dates, dry_run), user_dirs)
+    finally:
+        pool.close()
+        pool.join()
+        if profiler:
+            profiler.stop()
+
+    print_results(results)
+    if [result for result in results if result['error']]:
+        sys.exit(1)
+
+
+def get_user_dirs(path):
+    """
+    Return list of directories containing configuration of single user.
+
+    :param path: path to users directory or manifest file with one user directory per line
+    :return: list of str
+    """
+    if os.path.isdir(path):
+        names = sorted(os.listdir(path))
+        user_dirs = [os.path.join(path, name) for name in names]
+        return [user_dir for user_dir in user_dirs if os.path.isfile(os.path.join(user_dir, 'config.ini'))]
+
+    user_dirs = []
+    with open(path) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                user_dirs.append(os.path.join(os.path.dirname(os.path.abspath(path)), line))
+
+    return user_dirs
+
+
+def get_user_name(user_dir):
+    """
+    Return name of user shown in results, which is name of its directory.
+
+    :param user_dir: path to directory with config.ini of user
+    :return: str
+    """
+    return os.path.basename(os.path.normpath(user_dir))
+
+
+def export_user(src_path, user_dir, dates, dry_run):
+    """
+    Run whole export for single user and return its summary.
+
+    Errors are not raised, so failure of one user doesn't stop export of others.
+
+    :param src_path: path to directory with config.ini.dist
+    :param user_dir: path to directory with config.ini and calendar credentials of user
+    :param dates: list of datetime
+    :param dry_run: Simulated run without creating new entries in e-conomic
+    :return: dict
+    """
+    result = {'user': get_user_name(user_dir), 'added': 0, 'not_added': 0, 'error': None}
+    start = time.time()
+    try:
+        config = get_configuration(src_path, os.path.join(user_dir, 'config.ini'))
+        entries = export(config, os.path.abspath(user_dir), dates, dry_run)
+        result['added'] = len([entry for entry in entries if entry])
+        result['not_added'] = len(entries) - result['added']
+    except SystemExit as e:
+        result['error'] = e.code if isinstance(e.code, str) else 'invalid configuration'
+    except Exception as e:
+        result['error'] = str(e) or e.__class__.__name__
+    result['time'] = time.time() - start
+
+    return result
+
+
+class UserOutput(object):
+
+    """
+    Standard output printing output of each user export as single block.
+
+    Everything printed by thread running export and threads started by it
+    (pipeline stages, background jobs, thread pools) is buffered and printed
+    under name of user when export is finished, so lines of users exported
+    at the same time are not mixed. Output of other threads is printed directly.
+
+    :param stream: original standard output
+    """
+
+    def __init__(self, stream):
+        """
+        Prepare output, it's used instead of sys.stdout inside with statement.
+
+        :param stream: file-like object
+        """
+        self.stream = stream
+        self.buffers = {}
+        self.lock = threading.Lock()
+        self.thread_init = None
+
+    def __enter__(self):
+        """Replace sys.stdout and make new threads write to buffer of thread starting them."""
+        output = self
+        thread_init = self.thread_init = threading.Thread.__init__
+
+        def init(thread, *args, **kwargs):
+            thread_init(thread, *args, **kwargs)
+            buffer = output.buffers.get(threading.current_thread())
+            if buffer is not None:
+                output.buffers[thread] = buffer
+
+        threading.Thread.__init__ = init
+        sys.stdout = self
+
+        return self
+
+    def __exit__(self, *args):
+        """Restore sys.stdout and threads."""
+        sys.stdout = self.stream
+        threading.Thread.__init__ = self.thread_init
+
+    def call(self, name, function, *args):
+        """
+        Call function and print its output as block with given name.
+
+        :param name: name of block
+        :param function: callable
+        :return: result of function
+        """
+        buffer = []
+        self.buffers[threading.current_thread()] = buffer
+        try:
+            return function(*args)
+        finally:
+            with self.lock:
+                for thread in [thread for thread, used in self.buffers.items() if used is buffer]:
+                    del self.buffers[thread]
+                self.stream.write('\n== %s ==\n%s' % (name, ''.join(buffer)))
+                self.stream.flush()
+
+    def write(self, text):
+        """Write text to buffer of current thread or directly to original stream."""
+        buffer = self.buffers.get(threading.current_thread())
+        if buffer is None:
+            self.stream.write(text)
+        else:
+            buffer.append(text)
+
+    def flush(self):
+        """Flush original stream, buffers are printed when export is finished."""
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        """Return other attributes (e.g. encoding) of original stream."""
+        return getattr(self.stream, name)
+
+
+def print_results(results):
+    """
+    Print summary table with results of all users.
+
+    :param results: list of dicts returned by export_user()
+    """
+    width = max([len('User')] + [len(result['user']) for result in results])
+    print()
+    print('%s  %-6s  %5s  %9s  %7s' % ('User'.ljust(width), 'Status', 'Added', 'Not added', 'Time'))
+    for result in results:
+        print('%s  %-6s  %5d  %9d  %6.1fs%s' % (
+            result['user'].ljust(width),
+            'ERROR' if result['error'] else 'OK',
+            result['added'],
+            result['not_added'],
+            result['time'],
+            '  ' + result['error'] if result['error'] else ''
+        ))
+
+
+if __name__ == '__main__':
+    batch()
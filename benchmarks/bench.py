@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+"""Microbenchmarks of code run for every calendar event or time entry."""
+from __future__ import print_function
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import datasets  # noqa: E402
+from economicpy.calendar_google import CalendarGoogle  # noqa: E402
+from economicpy.calendar_outlook import CalendarOutlook  # noqa: E402
+from economicpy.economic import Economic  # noqa: E402
+from economicpy.entry_store import EntryStore  # noqa: E402
+from economicpy.fake_servers import FakeEconomicServer  # noqa: E402
+
+CASES = []
+
+# Modules which import time is measured, "interpreter" is startup of Python without imports.
+IMPORTS = [
+    ('interpreter', 'pass'),
+    ('run', 'import run'),
+    ('calendar_google', 'import economicpy.calendar_google'),
+    ('calendar_outlook', 'import economicpy.calendar_outlook'),
+    ('economic', 'import economicpy.economic'),
+    ('jira', 'import economicpy.jira'),
+]
+
+
+def case(function):
+    """
+    Register benchmark case.
+
+    Case is called with dataset size and returns function to be timed.
+    """
+    CASES.append(function)
+
+    return function
+
+
+def get_ignore_config(phrases=500):
+    """
+    Return calendar configuration with large list of ignored phrases.
+
+    :param phrases: number of ignored phrases
+    :return: list of tuples
+    """
+    return datasets.calendar_config + [('ignore_events', ','.join(datasets.get_ignore_phrases(phrases)))]
+
+
+@case
+def skip_ignored_events(size):
+    """Skip events with summary containing one of 500 ignored phrases."""
+    calendar = CalendarGoogle(get_ignore_config(), '')
+    events = datasets.get_google_events(size, ignore_phrases=datasets.get_ignore_phrases(500))
+
+    return lambda: calendar.skip_ignored_events(events)
+
+
+@case
+def get_project_and_activity_id(size):
+    """Extract project and activity ID from 10KB descriptions with get_project_id() and get_activity_id()."""
+    calendar = CalendarGoogle(get_ignore_config(), '')
+    descriptions = [event['description'] for event in datasets.get_google_events(size, description_size=10000)]
+
+    def run():
+        for description in descriptions:
+            calendar.get_project_id(description)
+            calendar.get_activity_id(description)
+
+    return run
+
+
+@case
+def get_ids(size):
+    """Extract project and activity ID from 10KB descriptions with get_ids(), lowercasing each description once."""
+    calendar = CalendarGoogle(get_ignore_config(), '')
+    descriptions = [event['description'] for event in datasets.get_google_events(size, description_size=10000)]
+
+    def run():
+        for description in descriptions:
+            calendar.get_ids(description)
+
+    return run
+
+
+@case
+def google_filter_chain(size):
+    """Pass Google Calendar events through all filters."""
+    calendar = CalendarGoogle(get_ignore_config(), '')
+    events = datasets.get_google_events(size, ignore_phrases=datasets.get_ignore_phrases(500))
+
+    return lambda: list(calendar.filter_events(events))
+
+
+@case
+def outlook_filter_chain(size):
+    """Pass Office365 events through all filters."""
+    calendar = CalendarOutlook(get_ignore_config())
+    events = datasets.get_outlook_events(size, ignore_phrases=datasets.get_ignore_phrases(500))
+
+    return lambda: list(calendar.filter_events(events))
+
+
+def get_economic(server, directory):
+    """
+    Return Economic logged in to fake server.
+
+    :param server: FakeEconomicServer
+    :param directory: cache directory
+    :return: Economic
+    """
+    config = [
+        ('agreement', '1'), ('username', 'user'), ('password', 'secret'), ('user_id', '1'),
+        ('description_format', '\n1 = {DEFAULT} - {CUSTOM}\n3 = {CUSTOM}'), ('default_project_id', '100'),
+        ('cache_dir', directory), ('activity_cache_ttl', '0'), ('reuse_session', 'no'), ('base_url', server.url)
+    ]
+
+    return Economic(config, datetime.datetime.strptime(datasets.DAY, '%Y-%m-%d'))
+
+
+def with_economic(function):
+    """
+    Call case with Economic logged in to fake server which page contains 1000 registered entries.
+
+    Activities are fetched before server is stopped, so timed function doesn't make any requests.
+    """
+    def wrapper(size):
+        directory = tempfile.mkdtemp()
+        try:
+            with FakeEconomicServer(size=1000, activities=10) as server:
+                economic = get_economic(server, directory)
+                economic.init_activities(100)
+
+                return function(size, economic)
+        finally:
+            shutil.rmtree(directory)
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+
+    return wrapper
+
+
+@case
+@with_economic
+def convert_calendar_event_to_entry(size, economic):
+    """Convert calendar events to time entries."""
+    events = datasets.get_calendar_entries(size)
+
+    def run():
+        for event in events:
+            economic.convert_calendar_event_to_entry(event)
+
+    return run
+
+
+@case
+@with_economic
+def get_description(size, economic):
+    """Format time entry descriptions."""
+    events = datasets.get_calendar_entries(size)
+
+    def run():
+        for event in events:
+            economic.get_description(event['title'], event['activity_id'], event['project_id'])
+
+    return run
+
+
+@case
+@with_economic
+def duplicate_check(size, economic):
+    """Check time entries against 1000 registered entries, as done by add_time_entry()."""
+    entries = [economic.convert_calendar_event_to_entry(event) for event in datasets.get_calendar_entries(size)]
+    registered = dict(economic.entries.entries)
+
+    def run():
+        economic.entries.entries = dict(registered)
+        for entry in entries:
+            economic.reserve_time_entry(entry)
+
+    return run
+
+
+@case
+def load_tasks_html(size):
+    """Parse e-conomic day page with registered time entries."""
+    html = datasets.get_tasks_html(size)
+
+    return lambda: EntryStore().load(datasets.DAY, html)
+
+
+def measure(function, repeat):
+    """
+    Call function given number of times and return times of calls.
+
+    Output printed by function is discarded.
+
+    :param function: callable
+    :param repeat: int
+    :return: list of float
+    """
+    times = []
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            for _ in range(repeat):
+                start = timeit.default_timer()
+                function()
+                times.append(timeit.default_timer() - start)
+        finally:
+            sys.stdout = stdout
+
+    return times
+
+
+def measure_import(statement, repeat):
+    """
+    Run statement in new interpreter given number of times and return times of runs.
+
+    New interpreter is used, so modules imported by earlier runs aren't cached.
+
+    :param statement: Python code
+    :param repeat: int
+    :return: list of float
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(repeat):
+            start = timeit.default_timer()
+            subprocess.check_call([sys.executable, '-c', statement], cwd=ROOT, stdout=devnull)
+            times.append(timeit.default_timer() - start)
+
+    return times
+
+
+def write_results(output, results):
+    """
+    Save results to JSON file together with Python version and platform.
+
+    :param output: path of JSON file
+    :param results: dict with results
+    """
+    with open(output, 'w') as output_file:
+        json.dump({
+            'time': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results
+        }, output_file, indent=2, sort_keys=True)
+
+
+def run_cases(names, sizes, repeat):
+    """
+    Run benchmark cases for all dataset sizes.
+
+    :param names: names of cases to be run, all when empty
+    :param sizes: list of int
+    :param repeat: number of timed calls of each case
+    :return: dict with results
+    """
+    results = {}
+    for function in CASES:
+        if names and function.__name__ not in names:
+            continue
+        for size in sizes:
+            stdout = sys.stdout
+            with open(os.devnull, 'w') as devnull:
+                sys.stdout = devnull
+                try:
+                    timed = function(size)
+                finally:
+                    sys.stdout = stdout
+            times = sorted(measure(timed, repeat))
+            result = {
+                'case': function.__name__,
+                'size': size,
+                'repeat': repeat,
+                'best': times[0],
+                'median': times[len(times) // 2],
+                'per_item_us': times[0] / size * 1e6,
+            }
+            results['%s[%d]' % (function.__name__, size)] = result
+            print('%-40s %10.4fs %10.4fs %10.2fus' % ('%s[%d]' % (function.__name__, size), result['best'],
+                                                    result['median'], result['per_item_us']))
+
+    return results
+
+
+@click.group()
+def cli():
+    """Microbenchmarks of code run for every calendar event or time entry."""
+
+
+@cli.command()
+@click.option('--sizes', default='1000,10000', help='Comma separated sizes of datasets, e.g. 1000,10000,100000.')
+@click.option('--repeat', default=5, help='Number of timed runs of each case, best one is compared.')
+@click.option('--case', 'names', multiple=True, help='Name of case to be run, all cases are run by default.')
+@click.option('--output', default=None, type=click.Path(), help='Path of JSON file results are saved to.')
+def run(sizes, repeat=5, names=None, output=None):
+    """
+    Run benchmarks and print their results.
+
+    :param sizes: comma separated sizes of datasets
+    :param repeat: number of timed runs of each case
+    :param names: names of cases to be run
+    :param output: path of JSON file with results
+    """
+    unknown = set(names or []) - set(function.__name__ for function in CASES)
+    if unknown:
+        sys.exit('Unknown benchmark case: %s' % ', '.join(sorted(unknown)))
+
+    print('%-40s %11s %11s %12s' % ('case[size]', 'best', 'median', 'per item'))
+    results = run_cases(names, [int(size) for size in sizes.split(',')], repeat)
+    if output:
+        write_results(output, results)
+
+
+@cli.command()
+@click.option('--repeat', default=10, help='Number of interpreters started for each import, best one is compared.')
+@click.option('--output', default=None, type=click.Path(), help='Path of JSON file results are saved to.')
+def imports(repeat=10, output=None):
+    """
+    Measure time of starting interpreter and importing modules used by run.py.
+
+    Results can be compared with "compare" command like results of "run" command.
+
+    :param repeat: number of interpreters started for each import
+    :param output: path of JSON file with results
+    """
+    print('%-40s %11s %11s %12s' % ('import', 'best', 'median', 'without py'))
+    results = {}
+    interpreter = None
+    for name, statement in IMPORTS:
+        times = sorted(measure_import(statement, repeat))
+        if interpreter is None:
+            interpreter = times[0]
+        result = {
+            'case': 'import',
+            'module': name,
+            'repeat': repeat,
+            'best': times[0],
+            'median': times[len(times) // 2],
+            'import': times[0] - interpreter,
+        }
+        results['import[%s]' % name] = result
+        print('%-40s %10.4fs %10.4fs %11.4fs' % ('import[%s]' % name, result['best'], result['median'],
+                                                 result['import']))
+    if output:
+        write_results(output, results)
+
+
+@cli.command()
+@click.argument('baseline', type=click.Path(exists=True))
+@click.argument('current', type=click.Path(exists=True))
+@click.option('--threshold', default=10.0, help='Slowdown in percent reported as regression.')
+def compare(baseline, current, threshold=10.0):
+    """
+    Compare two files with results, exit with error when any case is slower than threshold.
+
+    :param baseline: path of JSON file with baseline results
+    :param current: path of JSON file with current results
+    :param threshold: slowdown in percent reported as regression
+    """
+    with open(baseline) as baseline_file:
+        baseline_results = json.load(baseline_file)['results']
+    with open(current) as current_file:
+        current_results = json.load(current_file)['results']
+
+    regressions = 0
+    print('%-40s %11s %11s %9s' % ('case[size]', 'baseline', 'current', 'change'))
+    for name in sorted(set(baseline_results) & set(current_results)):
+        before = baseline_results[name]['best']
+        after = current_results[name]['best']
+        change = (after - before) / before * 100 if before else 0.0
+        status = ''
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions += 1
+        print('%-40s %10.4fs %10.4fs %+8.1f%% %s' % (name, before, after, change, status))
+
+    if regressions:
+        sys.exit('%d case(s) slower by more than %.1f%%' % (regressions, threshold))
+
+
+if __name__ == '__main__':
+    cli()
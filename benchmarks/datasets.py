@@ -0,0 +1,175 @@
+"""Generated datasets used by benchmarks, same seed always gives same data."""
+import random
+
+DAY = '1970-01-01'
+
+calendar_config = [
+    ('project_id_pattern', '#economic[^0-9]+([0-9]+)'),
+    ('activity_id_pattern', '#activity[^0-9]+([0-9]+)'),
+    ('default_activity_id', 1),
+    ('default_project_id', 100),
+    ('mock_enabled', True),
+    ('email', 'user@example.com'),
+    ('password', 'secret'),
+]
+
+
+def get_ignore_phrases(count, seed=1):
+    """
+    Return list of phrases to be ignored, as used in "ignore_events" option.
+
+    :param count: number of phrases
+    :param seed: random seed
+    :return: list
+    """
+    generator = random.Random(seed)
+    words = ['standup', 'lunch', 'ooo', 'holiday', 'focus time', 'commute', 'gym', 'dentist', 'private', 'busy']
+
+    return ['%s %d' % (generator.choice(words), index) for index in range(count)]
+
+
+def get_description(index, size, generator):
+    """
+    Return meeting description with pasted agenda, project and activity ID.
+
+    :param index: number of event
+    :param size: length of agenda
+    :param generator: random.Random
+    :return: str
+    """
+    agenda = []
+    length = 0
+    while length < size:
+        line = '%d. Discuss item %d of backlog, owner: person %d\n' % (len(agenda) + 1, generator.randint(1, 999),
+                                                                        generator.randint(1, 50))
+        agenda.append(line)
+        length += len(line)
+    ids = '#economic: %d\n#activity: %d\n' % (100 + index % 10, 1 + index % 5)
+    # IDs are placed either before or after agenda.
+    if index % 2:
+        return ids + ''.join(agenda)[:size]
+
+    return ''.join(agenda)[:size] + ids
+
+
+def get_summary(index, generator, ignore_phrases, ignored_ratio):
+    """
+    Return event summary, some of them contain ignored phrases.
+
+    :return: str
+    """
+    if ignore_phrases and generator.random() < ignored_ratio:
+        return 'Team %s' % generator.choice(ignore_phrases).title()
+
+    return 'Meeting %d about project %d' % (index, generator.randint(1, 100))
+
+
+def get_google_events(count, description_size=2000, attendees=5, ignore_phrases=None, ignored_ratio=0.1, seed=1):
+    """
+    Return Google Calendar events.
+
+    Most events pass all filters, others have no attendees, aren't accepted,
+    last whole day or contain ignored phrase.
+
+    :param count: number of events
+    :param description_size: length of descriptions
+    :param attendees: number of attendees of each event
+    :param ignore_phrases: list of phrases, some of them are put into summaries
+    :param ignored_ratio: part of events containing ignored phrase
+    :param seed: random seed
+    :return: list
+    """
+    generator = random.Random(seed)
+    events = []
+    for index in range(count):
+        hour = 8 + index % 10
+        event = {
+            'id': 'event%d' % index,
+            'status': 'confirmed',
+            'summary': get_summary(index, generator, ignore_phrases, ignored_ratio),
+            'description': get_description(index, description_size, generator),
+            'start': {'dateTime': '%sT%02d:00:00Z' % (DAY, hour)},
+            'end': {'dateTime': '%sT%02d:30:00Z' % (DAY, hour)},
+            'attendees': [{'email': 'user%d@example.com' % number, 'responseStatus': 'accepted'}
+                          for number in range(attendees - 1)],
+        }
+        kind = index % 20
+        if kind == 0:
+            del event['attendees']
+        else:
+            event['attendees'].append({'self': True, 'responseStatus': 'declined' if kind == 1 else 'accepted'})
+        if kind == 2:
+            event['start'] = {'date': DAY}
+            event['end'] = {'date': DAY}
+        events.append(event)
+
+    return events
+
+
+def get_outlook_events(count, description_size=2000, attendees=5, ignore_phrases=None, ignored_ratio=0.1, seed=1):
+    """
+    Return Office365 events, see get_google_events().
+
+    :return: list
+    """
+    generator = random.Random(seed)
+    events = []
+    for index in range(count):
+        hour = 8 + index % 10
+        event = {
+            'Id': 'event%d' % index,
+            'Subject': get_summary(index, generator, ignore_phrases, ignored_ratio),
+            'Body': {'ContentType': 'Text', 'Content': get_description(index, description_size, generator)},
+            'Start': '%sT%02d:00:00Z' % (DAY, hour),
+            'End': '%sT%02d:30:00Z' % (DAY, hour),
+            'ResponseStatus': {'Response': 'Accepted'},
+            'Attendees': [{'EmailAddress': {'Address': 'user%d@example.com' % number}, 'Status': 'Accepted'}
+                          for number in range(attendees)],
+        }
+        kind = index % 20
+        if kind == 0:
+            del event['Attendees']
+        elif kind == 1:
+            event['ResponseStatus']['Response'] = 'Declined'
+        events.append(event)
+
+    return events
+
+
+def get_calendar_entries(count, seed=1):
+    """
+    Return events converted by calendar, ready to be converted to time entries.
+
+    :param count: number of events
+    :param seed: random seed
+    :return: list
+    """
+    generator = random.Random(seed)
+    entries = []
+    for index in range(count):
+        hour = 8 + index % 10
+        entries.append({
+            'start_date': '%sT%02d:00:00Z' % (DAY, hour),
+            'end_date': '%sT%02d:%02d:00Z' % (DAY, hour, generator.choice([15, 30, 45])),
+            'title': 'Meeting %d about project %d' % (index, generator.randint(1, 100)),
+            'project_id': 100,
+            'activity_id': 1 + index % 5,
+        })
+
+    return entries
+
+
+def get_tasks_html(count):
+    """
+    Return e-conomic day page with given number of registered time entries.
+
+    :param count: number of time entries
+    :return: unicode
+    """
+    rows = [u'<tr><th>Date</th><th>Project</th><th>Activity</th><th>Description</th><th>Hours</th></tr>']
+    for index in range(count):
+        rows.append(u'<tr class="row"><td>%s</td><td>100 Project</td><td>%d Activity</td>'
+                    u'<td>Activity %d - Meeting %d about project</td><td>0,5</td></tr>'
+                    % (DAY, 1 + index % 5, 1 + index % 5, index))
+
+    return u'<html><body><table class="entries">%s</table></body></html>' % u''.join(rows)
@@ -1,4 +1,6 @@
+from __future__ import print_function
 import re
+from id_extractor import IdExtractor
 
 
 class Calendar(object):
@@ -17,27 +19,72 @@ class Calendar(object):
             self.config[key] = value
         self.user_agent = 'economic-py'
         self.ignore_events = self.config['ignore_events'].lower().split(',')
+        phrases = [re.escape(phrase) for phrase in self.ignore_events if phrase]
+        self.ignore_pattern = re.compile('|'.join(phrases)) if phrases else None
+        self.id_extractor = IdExtractor(self.config.get('project_id_pattern'),
+                                        self.config.get('activity_id_pattern'),
+                                        self.config.get('default_project_id', False),
+                                        self.config.get('default_activity_id', False))
         self.event_summary_field = ''
         self.event_attendees_field = ''
+        self.skipped = {}
+        self.filters = []
+        self.add_filter('no attendees', self.has_attendees)
+        self.add_filter('contains ignored phrase', lambda event: not self.ignore_event(event))
+
+    def add_filter(self, reason, predicate):
+        """
+        Register filter that has to be passed by event to be exported.
+
+        :param reason: reason of skipping event printed when predicate is not met
+        :param predicate: function called with event, returns bool
+        :type reason: str
+        """
+        self.filters.append((reason, predicate))
+
+    def filter_events(self, events):
+        """
+        Generator returning events that pass all registered filters.
+
+        All filters are checked for one event before next one is taken,
+        filter that wasn't passed is recorded as reason of skipping event.
+
+        :param events: iterable
+        """
+        for event in events:
+            for reason, predicate in self.filters:
+                if not predicate(event):
+                    self.skip_event(event, reason)
+                    break
+            else:
+                yield event
+
+    def skip_event(self, event, reason):
+        """
+        Record and print reason of skipping event.
+
+        :param event: dict
+        :param reason: str
+        """
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        print('SKIPPED (%s) - %s' % (reason, event[self.event_summary_field]))
 
     def ignore_event(self, event):
         """
         Based on configuration return info whether event should be ignored.
 
         If task summary contains one of ignored phrases then whole event
-        will be ignored.
+        will be ignored. All phrases are compiled into one pattern, so summary
+        is searched only once.
 
         :param event:
         :type event: dict
         :return bool
         """
-        ignore = False
-
-        for ignore_event in self.ignore_events:
-            if ignore_event and ignore_event in event[self.event_summary_field].lower():
-                ignore = True
+        if self.ignore_pattern is None:
+            return False
 
-        return ignore
+        return self.ignore_pattern.search(event[self.event_summary_field].lower()) is not None
 
     def skip_ignored_events(self, events):
         """
@@ -53,10 +100,22 @@ class Calendar(object):
             if not self.ignore_event(event):
                 output.append(event)
             else:
-                print('SKIPPED (contains ignored phrase) - %s' % event[self.event_summary_field])
+                self.skip_event(event, 'contains ignored phrase')
 
         return output
 
+    def get_ids(self, description):
+        """
+        Get e-conomic project and activity ID from event description.
+
+        Description is lowercased only once for both IDs.
+
+        :type description: str
+        :param description: description of meeting
+        :return: tuple
+        """
+        return self.id_extractor.extract(description)
+
     def get_project_id(self, description):
         """
         Get e-conomic project ID from event description.
@@ -65,14 +124,7 @@ class Calendar(object):
         :type description: str
         :param description: description of meeting
         """
-        if not self.config.get('project_id_pattern'):
-            return -1
-
-        result = re.findall(self.config.get('project_id_pattern'), description.lower())
-        if result:
-            return int(result[-1])
-
-        return self.config.get('default_project_id', False)
+        return self.id_extractor.find_project_id(description.lower())
 
     def get_activity_id(self, description):
         """
@@ -85,14 +137,7 @@ class Calendar(object):
         :type description: str
         :param description: description of meeting
         """
-        if not self.config.get('activity_id_pattern'):
-            return -1
-
-        result = re.search(self.config.get('activity_id_pattern'), description.lower())
-        if result:
-            return int(result.groups()[0])
-
-        return self.config.get('default_activity_id', False)
+        return self.id_extractor.find_activity_id(description.lower())
 
     def get_events_with_attendees(self, events):
         """
@@ -103,9 +148,18 @@ class Calendar(object):
         """
         output = []
         for event in events:
-            if self.event_attendees_field in event:
+            if self.has_attendees(event):
                 output.append(event)
             else:
-                print("SKIPPED (no attendees) - %s" % (event[self.event_summary_field]))
+                self.skip_event(event, 'no attendees')
 
         return output
+
+    def has_attendees(self, event):
+        """
+        Check whether event has attendees.
+
+        :param event: dict
+        :return: bool
+        """
+        return self.event_attendees_field in event
@@ -1,13 +1,59 @@
 from __future__ import print_function
+import hashlib
 import httplib2
+import os
+import time
 
 from calendar import Calendar
+from event_store import EventStore
+from metrics import metrics
+from options import get_cache_dir, is_enabled
 from apiclient.discovery import build
+from apiclient.errors import HttpError
 from oauth2client import tools
 from oauth2client.file import Storage
 from oauth2client.client import OAuth2WebServerFlow
 
 
+class CompressedHttp(httplib2.Http):
+
+    """
+    HTTP client asking for gzip compressed responses and counting size of received content.
+
+    Google APIs compress responses only when user agent contains "gzip".
+    All requests are recorded in metrics.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Init counters of received responses."""
+        super(CompressedHttp, self).__init__(*args, **kwargs)
+        self.responses = 0
+        self.received_bytes = 0
+
+    def request(self, uri, method='GET', body=None, headers=None, *args, **kwargs):
+        """
+        Make request with gzip enabled, see httplib2.Http.request().
+
+        :return: tuple with response and its content
+        """
+        headers = dict(headers or {})
+        user_agent = ''
+        for name in list(headers):
+            if name.lower() == 'user-agent':
+                user_agent = headers.pop(name)
+        if 'gzip' not in user_agent:
+            user_agent = (user_agent + ' (gzip)').strip()
+        headers['user-agent'] = user_agent
+        headers['accept-encoding'] = 'gzip'
+        start = time.time()
+        response, content = super(CompressedHttp, self).request(uri, method, body, headers, *args, **kwargs)
+        self.responses += 1
+        self.received_bytes += len(content or '')
+        metrics.add_request('google', uri, time.time() - start, response.status, len(content or ''), len(body or ''))
+
+        return response, content
+
+
 class CalendarGoogle(Calendar):
     """
     Class related to communication with Google Calendar using API V3.
@@ -16,6 +62,10 @@ class CalendarGoogle(Calendar):
     :param src_path: str
     """
 
+    # Only fields used by filters and conversion to time entry are fetched.
+    event_fields = 'nextPageToken,nextSyncToken,' \
+                   'items(id,status,summary,description,start,end,attendees(self,responseStatus))'
+
     def __init__(self, config, src_path):
         """
             Set configuration and init variables.
@@ -26,10 +76,21 @@ class CalendarGoogle(Calendar):
         super(CalendarGoogle, self).__init__(config)
         self.event_summary_field = 'summary'
         self.event_attendees_field = 'attendees'
+        self.add_filter('not attending', self.is_accepted)
+        self.add_filter('dates issue', self.verify_dates)
+        self.page_size = int(self.config.get('page_size') or 250)
+        self.service = None
+        self.http = None
+        self.sync_token = None
+        self.event_store = None
+        if is_enabled(self.config, 'incremental_sync'):
+            # Events contain descriptions, so they are kept in cache directory. Each user
+            # (directory with credentials) has separate copy.
+            user_id = hashlib.sha1(os.path.abspath(src_path).encode('utf8')).hexdigest()[:16]
+            self.event_store = EventStore(get_cache_dir(self.config), 'google-events-' + user_id)
         if self.config.get('mock_enabled', False):
             return
 
-        self.service = None
         self.login(src_path)
 
     def login(self, src_path):
@@ -39,6 +100,14 @@ class CalendarGoogle(Calendar):
         :param src_path: path to calendar credentials
         :type src_path: str
         """
+        if self.config.get('api_url'):
+            # Other API root (e.g. local fake server) is used without credentials.
+            self.http = CompressedHttp()
+            self.service = build(serviceName='calendar', version='v3', http=self.http, cache_discovery=False,
+                                 discoveryServiceUrl=self.config['api_url'].rstrip('/') +
+                                 '/discovery/v1/apis/{api}/{apiVersion}/rest')
+            return
+
         # The client_id and client_secret can be found in Google Developers Console
         flow = OAuth2WebServerFlow(
             client_id=self.config['client_id'],
@@ -59,8 +128,8 @@ class CalendarGoogle(Calendar):
 
         # Create an httplib2.Http object to handle our HTTP requests and authorize it
         # with our good Credentials.
-        http = httplib2.Http()
-        http = credentials.authorize(http)
+        self.http = CompressedHttp()
+        http = credentials.authorize(self.http)
         # Build a service object for interacting with the API. Visit
         # the Google Developers Console
         # to get a developerKey for your own application.
@@ -87,6 +156,20 @@ class CalendarGoogle(Calendar):
 
         return True
 
+    @staticmethod
+    def is_accepted(event):
+        """
+        Check whether event is accepted by current user.
+
+        :param event: dict
+        :return: bool
+        """
+        for attendee in event['attendees']:
+            if 'self' in attendee:
+                return attendee['responseStatus'] == 'accepted'
+
+        return False
+
     @staticmethod
     def get_accepted_events(events):
         """
@@ -97,12 +180,10 @@ class CalendarGoogle(Calendar):
         """
         output = []
         for event in events:
-            for attendee in event['attendees']:
-                if 'self' in attendee:
-                    if attendee['responseStatus'] == 'accepted':
-                        output.append(event)
-                    else:
-                        print("SKIPPED (not attending) - %s" % (event['summary']))
+            if CalendarGoogle.is_accepted(event):
+                output.append(event)
+            else:
+                print("SKIPPED (not attending) - %s" % (event['summary']))
 
         return output
 
@@ -120,7 +201,7 @@ class CalendarGoogle(Calendar):
             if self.verify_dates(event):
                 output.append(event)
             else:
-                print("SKIPPED (dates issue) - %s" % (event['summary']))
+                self.skip_event(event, 'dates issue')
 
         return output
 
@@ -133,23 +214,71 @@ class CalendarGoogle(Calendar):
         :type end_date: str
         :type start_date: str
         """
+        if self.event_store is not None:
+            events = self.sync_events(start_date, end_date)
+        else:
+            events = self.list_events(timeMin=start_date, timeMax=end_date)
+
+        for event in self.filter_events(events):
+            project_id, activity_id = self.get_ids(event.get('description', ''))
+            yield {
+                'start_date': event['start']['dateTime'],
+                'end_date': event['end']['dateTime'],
+                'title': event['summary'].encode('utf8'),
+                'project_id': project_id,
+                'activity_id': activity_id
+            }
+        if self.http is not None:
+            print("Google Calendar: %d bytes received in %d responses" % (self.http.received_bytes,
+                                                                          self.http.responses))
+
+    def list_events(self, **params):
+        """
+        Generator returning events from all pages of events list.
+
+        Sync token returned with last page is saved in "sync_token" attribute.
+
+        :param params: additional parameters of events list request
+        """
         page_token = None
 
         while True:
             original_events = self.service.events().list(calendarId='primary', pageToken=page_token, singleEvents=True,
-                                                         timeMin=start_date, timeMax=end_date).execute()
-            events = self.get_events_with_attendees(original_events['items'])
-            events = self.get_accepted_events(events)
-            events = self.skip_ignored_events(events)
-            events = self.get_events_with_proper_dates(events)
-            for event in events:
-                yield {
-                    'start_date': event['start']['dateTime'],
-                    'end_date': event['end']['dateTime'],
-                    'title': event['summary'].encode('utf8'),
-                    'project_id': self.get_project_id(event.get('description', '')),
-                    'activity_id': self.get_activity_id(event.get('description', ''))
-                }
+                                                         maxResults=self.page_size, fields=self.event_fields,
+                                                         **params).execute()
+            for event in original_events['items']:
+                yield event
             page_token = original_events.get('nextPageToken')
             if not page_token:
+                self.sync_token = original_events.get('nextSyncToken')
                 break
+
+    def sync_events(self, start_date, end_date):
+        """
+        Update local copy of events and return events between given dates.
+
+        Only events changed since previous sync are fetched. Full sync starting
+        at given date is made when there was no previous sync, it started later
+        or its sync token has expired.
+
+        :param start_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :param end_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :return: list
+        """
+        store = self.event_store
+        store.load()
+        events = None
+        if store.is_synced(start_date):
+            try:
+                events = list(self.list_events(syncToken=store.sync_token))
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                print("Google Calendar: sync token expired, running full sync")
+        if events is None:
+            store.reset(start_date)
+            events = list(self.list_events(timeMin=start_date))
+        store.update(events, self.sync_token)
+        store.save()
+
+        return store.get_events(start_date, end_date)
@@ -1,7 +1,11 @@
 from __future__ import print_function
 from calendar import Calendar
+from event_store import OutlookEventStore
+from file_cache import FileCache
+from http_session import create_session
+from options import get_cache_dir, is_enabled
+import hashlib
 import requests
-import json
 
 
 class CalendarOutlook(Calendar):
@@ -11,6 +15,9 @@ class CalendarOutlook(Calendar):
     :param config: list
     """
 
+    # Only fields used by filters and conversion to time entry are fetched.
+    event_fields = 'Id,Subject,Body,Start,End,ResponseStatus,Attendees'
+
     def __init__(self, config):
         """
         Set configuration and init variables.
@@ -18,9 +25,24 @@ class CalendarOutlook(Calendar):
         :type config: list of tuples
         """
         super(CalendarOutlook, self).__init__(config)
-        self.rest_api_url = 'https://outlook.office365.com/api/v1.0/me/calendarview?startDateTime=%s&endDateTime=%s'
+        api_url = self.config.get('api_url') or 'https://outlook.office365.com/api/v1.0/'
+        self.rest_api_url = api_url.rstrip('/') + '/me/calendarview?startDateTime=%s&endDateTime=%s'
         self.event_summary_field = 'Subject'
         self.event_attendees_field = 'Attendees'
+        self.add_filter('not attending', self.is_accepted)
+        self.session = create_session(self.config, 'office365')
+        self.page_size = int(self.config.get('page_size') or 50)
+        self.delta_link = None
+        cache_dir = get_cache_dir(self.config)
+        self.event_store = None
+        if is_enabled(self.config, 'incremental_sync'):
+            self.event_store = OutlookEventStore(cache_dir, 'outlook-events-%s' % self.config['email'])
+        self.page_cache = None
+        self.page_cache_ttl = int(self.config.get('page_cache_ttl') or 604800)
+        if is_enabled(self.config, 'page_cache'):
+            self.page_cache = FileCache(cache_dir)
+            # Pages of past date ranges are never requested again.
+            self.page_cache.prune('outlook-page-', self.page_cache_ttl)
 
     @staticmethod
     def verify_dates(event):
@@ -38,6 +60,16 @@ class CalendarOutlook(Calendar):
 
         return True
 
+    @staticmethod
+    def is_accepted(event):
+        """
+        Check whether event is accepted by current user.
+
+        :param event: dict
+        :return: bool
+        """
+        return 'ResponseStatus' in event and event['ResponseStatus']['Response'] == 'Accepted'
+
     @staticmethod
     def get_accepted_events(events):
         """
@@ -48,11 +80,10 @@ class CalendarOutlook(Calendar):
         """
         output = []
         for event in events:
-            if 'ResponseStatus' in event:
-                if event['ResponseStatus']['Response'] == 'Accepted':
-                    output.append(event)
-                else:
-                    print("SKIPPED (not attending) - %s" % (event['Subject']))
+            if CalendarOutlook.is_accepted(event):
+                output.append(event)
+            else:
+                print("SKIPPED (not attending) - %s" % (event['Subject']))
 
         return output
 
@@ -70,7 +101,7 @@ class CalendarOutlook(Calendar):
             if self.verify_dates(event):
                 output.append(event)
             else:
-                print("SKIPPED (dates issue) - %s" % (event['Subject']))
+                self.skip_event(event, 'dates issue')
 
         return output
 
@@ -83,24 +114,105 @@ class CalendarOutlook(Calendar):
         :type end_date: str
         :type start_date: str
         """
-        url = self.rest_api_url % (start_date, end_date)
+        if self.event_store is not None:
+            events = self.sync_events(start_date, end_date)
+        else:
+            events = self.list_events(self.rest_api_url % (start_date, end_date) + '&$select=' + self.event_fields)
+
+        for event in self.filter_events(events):
+            project_id, activity_id = self.get_ids(event['Body']['Content'])
+            yield {
+                'start_date': event['Start'],
+                'end_date': event['End'],
+                'title': event['Subject'].encode('utf8'),
+                'project_id': project_id,
+                'activity_id': activity_id
+            }
+
+    def list_events(self, url, track_changes=False):
+        """
+        Generator returning events from all pages of calendar view.
+
+        Delta link returned with last page of tracked calendar view is saved in "delta_link" attribute.
+
+        :param url: URL of first page
+        :param track_changes: whether delta link should be returned
+        :type url: str
+        :type track_changes: bool
+        """
+        prefer = ['odata.maxpagesize=%d' % self.page_size]
+        if track_changes:
+            prefer.append('odata.track-changes')
 
         while True:
-            response = requests.get(url, auth=(self.config['email'], self.config['password']))
-            response.raise_for_status()
-            response_json = json.loads(response.content)
-            events = response_json['value']
-            events = self.get_events_with_attendees(events)
-            events = self.get_accepted_events(events)
-            events = self.skip_ignored_events(events)
-            for event in events:
-                yield {
-                    'start_date': event['Start'],
-                    'end_date': event['End'],
-                    'title': event['Subject'].encode('utf8'),
-                    'project_id': self.get_project_id(event['Body']['Content']),
-                    'activity_id': self.get_activity_id(event['Body']['Content'])
-                }
+            # Pages of tracked calendar view depend on sync state, so they are never cached.
+            response_json = self.get_page(url, {'Prefer': ', '.join(prefer)}, not track_changes)
+            for event in response_json['value']:
+                yield event
             url = response_json.get('@odata.nextLink', None)
             if not url:
+                self.delta_link = response_json.get('@odata.deltaLink', None)
                 break
+
+    def sync_events(self, start_date, end_date):
+        """
+        Update local copy of calendar view and return its events.
+
+        Only events changed since previous sync are fetched using saved delta link.
+        Full sync is made when there was no previous sync of same time range
+        or delta link has expired.
+
+        :param start_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :param end_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :return: list
+        """
+        store = self.event_store
+        store.load()
+        events = None
+        if store.is_synced(start_date, end_date):
+            try:
+                events = list(self.list_events(store.sync_token, True))
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 410:
+                    raise
+                print("Office365: delta link expired, running full sync")
+        if events is None:
+            store.reset(store.get_range(start_date, end_date))
+            events = list(self.list_events(self.rest_api_url % (start_date, end_date), True))
+        store.update(events, self.delta_link)
+        store.save()
+
+        return store.get_events(start_date, end_date)
+
+    def get_page(self, url, headers, use_cache=True):
+        """
+        Return decoded page of calendar view.
+
+        When page cache is enabled, ETag of page is sent in If-None-Match header
+        and page saved on disk is used when server responds that it wasn't modified.
+        Pages older than "page_cache_ttl" seconds are removed from disk.
+
+        :param url: str
+        :param headers: dict
+        :param use_cache: whether page cache can be used for given URL
+        :raise requests.HTTPError: raised for unsuccessful response
+        :return: dict
+        """
+        cache_key = None
+        cached = None
+        if self.page_cache is not None and use_cache:
+            page_id = hashlib.sha1(('%s %s' % (self.config['email'], url)).encode('utf8')).hexdigest()
+            cache_key = 'outlook-page-' + page_id
+            cached = self.page_cache.get(cache_key, self.page_cache_ttl)
+            if cached:
+                headers = dict(headers, **{'If-None-Match': cached['etag']})
+
+        response = self.session.get(url, auth=(self.config['email'], self.config['password']), headers=headers)
+        if response.status_code == 304 and cached:
+            return cached['value']
+        response.raise_for_status()
+        response_json = response.json()
+        if cache_key is not None and response.headers.get('ETag'):
+            self.page_cache.set(cache_key, {'etag': response.headers['ETag'], 'value': response_json})
+
+        return response_json
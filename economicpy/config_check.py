@@ -11,13 +11,24 @@ class ConfigCheck(object):
     """
     Class used to validate configuration file against sample config.
 
-    It's role is to check whether all required options are set.
+    It's role is to check whether all required options are set. Options listed
+    in optional_settings have defaults, so config files created before they were
+    added are still valid.
 
     :param config_dist: str
     :param config_ini: str
     :raise Exception:
     """
 
+    optional_settings = {
+        'Jira': ['search_page_size', 'worklog_workers', 'inline_worklogs', 'pool_size', 'max_retries',
+                 'retry_backoff'],
+        'Economic': ['cache_dir', 'activity_cache_ttl', 'activity_cache_size', 'reuse_session', 'submit_workers',
+                     'base_url'],
+        'Google': ['api_url', 'page_size', 'incremental_sync', 'cache_dir'],
+        'Office365': ['api_url', 'page_size', 'incremental_sync', 'page_cache', 'page_cache_ttl', 'cache_dir'],
+    }
+
     def __init__(self, config_dist, config_ini):
         """
         Set path for dist and custom configuration files.
@@ -42,17 +53,40 @@ class ConfigCheck(object):
         """
         return [item[0] for item in tuples]
 
-    def find_differences(self, dist_items, ini_items):
+    def get_differences(self, dist_items, ini_items, optional=()):
         """
-        Find and return differences between two lists of settings.
+        Return names of settings missing in config file and names of settings not needed there.
 
         :param dist_items: list of tuples
         :param ini_items: list of tuples
+        :param optional: names of settings that don't have to be set
+        :return: tuple of lists
         """
         ini_keys = self.make_list(ini_items)
         dist_keys = self.make_list(dist_items)
-        missing_dist = list(set(dist_keys) - set(ini_keys))
-        missing_ini = list(set(ini_keys) - set(dist_keys))
+        missing_dist = sorted(set(dist_keys) - set(ini_keys) - set(optional))
+        missing_ini = sorted(set(ini_keys) - set(dist_keys))
+
+        return missing_dist, missing_ini
+
+    def find_differences(self, dist_items, ini_items, optional=()):
+        """
+        Find and print differences between two lists of settings.
+
+        :param dist_items: list of tuples
+        :param ini_items: list of tuples
+        :param optional: names of settings that don't have to be set
+        """
+        self.print_differences(*self.get_differences(dist_items, ini_items, optional))
+
+    @staticmethod
+    def print_differences(missing_dist, missing_ini):
+        """
+        Print names of settings missing in config file and names of settings not needed there.
+
+        :param missing_dist: list of str
+        :param missing_ini: list of str
+        """
         if missing_dist:
             print('Missing settings: %s' % ', '.join(missing_dist))
         if missing_ini:
@@ -60,7 +94,7 @@ class ConfigCheck(object):
 
     def check_sections(self, sections):
         """
-        Check whether number of config options is same in both files.
+        Check whether all required config options are set and no unknown ones are used.
 
         :param sections: list of section names to check in both files.
         :return boolean
@@ -72,9 +106,11 @@ class ConfigCheck(object):
         for section in sections:
             dist_items = dist.items(section)
             ini_items = ini.items(section)
-            if len(dist_items) != len(ini_items):
+            optional = self.optional_settings.get(section, [])
+            missing_dist, missing_ini = self.get_differences(dist_items, ini_items, optional)
+            if missing_dist or missing_ini:
                 print('Section [%s] in configuration file does not contain all required settings' % section)
-                self.find_differences(dist_items, ini_items)
+                self.print_differences(missing_dist, missing_ini)
 
                 return False
 
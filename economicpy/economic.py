@@ -1,8 +1,17 @@
 from __future__ import print_function
-import requests
+# Imported before threads are started, on Python 2 its lazy import by first strptime() call isn't thread safe.
+import _strptime  # noqa: F401
 import re
 import json
+import threading
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
+from entry_store import EntryStore
+from file_cache import FileCache
+from http_session import create_session
+from lru_cache import LRUCache
+from metrics import metrics
+from options import get_cache_dir, is_enabled
 
 
 class Economic(object):
@@ -21,14 +30,22 @@ class Economic(object):
         :param config: list
         :param date: str
         """
-        self.session = requests.session()
-        self.tasks_html = ""
+        self.entries = EntryStore()
+        self.loaded_days = set()
         self.medarbid = ""
-        self.activities = {}
         self.config = {}
         self.date = date
         for item in config:
             self.config[item[0]] = item[1]
+        self.base_url = (self.config.get('base_url') or 'https://secure.e-conomic.com').rstrip('/')
+        self.session = create_session(self.config, 'e-conomic')
+        self.entries_lock = threading.Lock()
+        self.login_lock = threading.Lock()
+        self.login_count = 0
+        self.activities = LRUCache(int(self.config.get('activity_cache_size') or 32))
+        self.activities_from_cache = set()
+        self.refresh_activities = False
+        self.cache = FileCache(get_cache_dir(self.config))
         self.init_activity_formatting()
 
         self.login()
@@ -46,7 +63,21 @@ class Economic(object):
         """
         Login to e-conomic service.
 
-        After login parse page looking for internal user ID and already registered tasks.
+        Session saved by previous run is reused when "reuse_session" option is enabled,
+        otherwise new one is created. After login parse page looking for already registered tasks.
+
+        :raise Exception: raised in case of invalid credentials
+        """
+        if not self.restore_session():
+            self.authenticate()
+
+        self.init_tasks()
+
+    def authenticate(self):
+        """
+        Create new e-conomic session using credentials from configuration.
+
+        After login parse page looking for internal user ID.
 
         :raise Exception: raised in case of invalid credentials
         """
@@ -55,22 +86,167 @@ class Economic(object):
             'brugernavn': self.config['username'],
             'password': self.config['password'],
         }
-        response = self.session.post('https://secure.e-conomic.com/secure/internal/login.asp', data,
-                                     allow_redirects=True)
-        if 'loginfejltype' in str(response.content):
-            raise Exception("ERROR: login to economic failed (check credentials)")
+        with metrics.phase('e-conomic authenticate'):
+            response = self.session.post(self.base_url + '/secure/internal/login.asp', data,
+                                         allow_redirects=True)
+            if 'loginfejltype' in str(response.content):
+                raise Exception("ERROR: login to economic failed (check credentials)")
 
-        self.init_medarbid()
-        self.init_tasks()
+            self.init_medarbid()
+        self.save_session()
+
+    def request(self, method, url, data=None):
+        """
+        Make request within current session, logging in again once if session has expired.
+
+        Re-login is serialized, requests of other threads which found the same session
+        expired wait for it and are retried within new session.
+
+        :param method: HTTP method
+        :param url: str
+        :param data: dict with form data
+        :return: requests.Response
+        """
+        login_count = self.login_count
+        response = self.session.request(method, url, data=data)
+        if self.is_session_expired(response):
+            # Requests are made from many threads, only first of them logs in again.
+            with self.login_lock:
+                if self.login_count == login_count:
+                    self.authenticate()
+                    self.login_count += 1
+            response = self.session.request(method, url, data=data)
+
+        return response
+
+    @staticmethod
+    def is_session_expired(response):
+        """
+        Check whether response is login page shown instead of requested one.
+
+        :param response: requests.Response
+        :return: bool
+        """
+        if '/internal/login.asp' in response.url.lower():
+            return True
+
+        return 'name="aftalenr"' in response.content.decode('utf8', 'replace').lower()
+
+    def get_session_cache_key(self):
+        """
+        Return key under which session of current user is saved.
+
+        :return: str
+        """
+        return 'session-%s-%s' % (self.config['agreement'], self.config['username'])
 
-    def init_activities(self):
-        """Get list of available activities from e-conomic and cache it for future use."""
-        url = "https://secure.e-conomic.com/secure/applet/fbsearch/fbsearch.asp?kar=10&id=%s&maxResultLength=1000"
-        response = self.session.get(url % self.config['default_project_id'])
-        activities = json.loads(response.content.decode('utf8'))
+    def save_session(self):
+        """Save session cookies and internal user ID, so they can be reused by next runs."""
+        if not self.is_session_reused():
+            return
+
+        cookies = []
+        for cookie in self.session.cookies:
+            cookies.append({
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'expires': cookie.expires
+            })
+        self.cache.set(self.get_session_cache_key(), {'cookies': cookies, 'medarbid': self.medarbid})
+
+    def restore_session(self):
+        """
+        Restore session saved by previous run.
+
+        :return: bool whether session was restored
+        """
+        if not self.is_session_reused():
+            return False
 
-        for row in activities['collection']:
-            self.activities[int(row['0'])] = row['1']
+        session = self.cache.get(self.get_session_cache_key())
+        if not session or not session['medarbid']:
+            return False
+
+        for cookie in session['cookies']:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'],
+                                     secure=cookie['secure'], expires=cookie['expires'])
+        self.medarbid = session['medarbid']
+
+        return True
+
+    def is_session_reused(self):
+        """
+        Check whether session should be saved and reused between runs.
+
+        :return: bool
+        """
+        return is_enabled(self.config, 'reuse_session')
+
+    def init_activities(self, project_id=None, refresh=False):
+        """
+        Get list of available activities of project from e-conomic and cache it for future use.
+
+        Activities of recently used projects are kept in memory (up to "activity_cache_size"
+        projects). They are also cached on disk for number of seconds set in "activity_cache_ttl"
+        option (0 disables cache), so usually they don't have to be fetched on every run.
+
+        :param project_id: project ID, default project is used when not given
+        :param refresh: whether to skip cached activities and fetch them again
+        :type refresh: bool
+        :return: dict
+        """
+        project_id = int(project_id or self.config['default_project_id'])
+        if refresh:
+            self.activities.set(project_id, self.load_activities(project_id, refresh))
+
+        return self.activities.get(project_id, self.load_activities)
+
+    def load_activities(self, project_id, refresh=False):
+        """
+        Load activities of project from disk cache or from e-conomic.
+
+        :param project_id: int
+        :param refresh: whether to skip disk cache
+        :type refresh: bool
+        :return: dict
+        """
+        ttl = int(self.config.get('activity_cache_ttl') or 0)
+        cache_key = self.get_activities_cache_key(project_id)
+        activities = None
+        if ttl and not refresh and not self.refresh_activities:
+            activities = self.cache.get(cache_key, ttl)
+
+        if activities is not None:
+            self.activities_from_cache.add(project_id)
+        else:
+            self.activities_from_cache.discard(project_id)
+            url = self.base_url + "/secure/applet/fbsearch/fbsearch.asp?kar=10&id=%s&maxResultLength=1000"
+            response = self.request('GET', url % project_id)
+            activities = {}
+            for row in json.loads(response.content.decode('utf8'))['collection']:
+                activities[int(row['0'])] = row['1']
+            if ttl:
+                self.cache.set(cache_key, activities)
+
+        return dict((int(activity_id), name) for activity_id, name in activities.items())
+
+    def get_activities_cache_key(self, project_id):
+        """
+        Return key under which activities of given project are cached.
+
+        :param project_id: int
+        :return: str
+        """
+        return 'activities-%s-%s' % (self.config['agreement'], project_id)
+
+    def invalidate_activities(self):
+        """Forget cached activities, so they will be fetched from e-conomic again during this run."""
+        self.refresh_activities = True
+        self.activities_from_cache.clear()
+        self.activities.clear()
 
     def add_time_entry(self, entry, dry_run=False):
         """
@@ -84,18 +260,49 @@ class Economic(object):
         :type dry_run: bool
         :return bool
         """
+        if not self.reserve_time_entry(entry):
+            return False
+
+        return self.post_time_entry(entry, dry_run)
+
+    def reserve_time_entry(self, entry):
+        """
+        Check whether time entry is not registered yet and add it to index of entries.
+
+        Entry is indexed before it's posted, so same entry submitted concurrently is skipped.
+
+        :param entry: dictionary with data to be added
+        :type entry: dict
+        :return bool whether entry should be posted
+        """
         if type(entry['task_description']) != str:
             entry['task_description'] = entry['task_description'].decode().encode('utf-8')
+        entry.setdefault('date', self.date.isoformat()[:10])
 
-        if entry['task_description'][:20] in self.tasks_html:
-            print("SKIPPED - %s" % (entry['task_description']))
-            return False
+        with self.entries_lock:
+            self.ensure_tasks(entry['date'])
+            if self.entries.contains(entry['date'], entry['task_description']):
+                print("SKIPPED - %s" % (entry['task_description']))
+                return False
+            self.add_to_entries(entry)
+
+        return True
 
+    def post_time_entry(self, entry, dry_run=False):
+        """
+        Post time entry form to e-conomic.
+
+        :param entry: dictionary with data to be added
+        :param dry_run: whether to really insert data or just simulate it
+        :type entry: dict
+        :type dry_run: bool
+        :return bool
+        """
         if dry_run:
             print("OK - time entry will be added: %s" % (entry['task_description']))
             return True
 
-        url = "https://secure.e-conomic.com/secure/applet/df_doform.asp?form=80&medarbid={MEDARBID}&theaction=post"
+        url = self.base_url + "/secure/applet/df_doform.asp?form=80&medarbid={MEDARBID}&theaction=post"
         url = url.replace('{MEDARBID}', self.medarbid)
         post_data = {
             'cs1': str(entry['date']),
@@ -107,16 +314,63 @@ class Economic(object):
             'cs11': "False",
             'cs4': None
         }
-        response = self.session.post(url, post_data)
+        with metrics.phase('e-conomic submit'):
+            response = self.request('POST', url, post_data)
 
         error_message = re.search(r'"errorMessage": "([^"]+)"', response.content.decode('utf8'))
         if error_message:
+            with self.entries_lock:
+                self.entries.remove(entry['date'], entry['task_description'])
             print("ERROR - time entry not added - %s: %s" % (error_message.groups()[0], entry['task_description']))
             return False
 
         print("OK - time entry added: %s" % entry['task_description'])
         return True
 
+    def add_time_entries(self, entries, dry_run=False, max_workers=None):
+        """
+        Add given time entries to e-conomic, submitting many of them at the same time.
+
+        Duplicates are checked in order of entries, then entries are posted concurrently.
+
+        :param entries: iterable of dictionaries with data to be added
+        :param dry_run: whether to really insert data or just simulate it
+        :param max_workers: maximum number of entries submitted at the same time,
+                            "submit_workers" option is used when not given
+        :type dry_run: bool
+        :return list of bool in same order as entries
+        """
+        entries = list(entries)
+        results = [self.reserve_time_entry(entry) for entry in entries]
+        reserved = [index for index, result in enumerate(results) if result]
+
+        workers = min(int(max_workers or self.config.get('submit_workers') or 1), len(reserved))
+        if workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                posted = pool.map(lambda index: self.post_time_entry(entries[index], dry_run), reserved)
+            finally:
+                pool.terminate()
+        else:
+            posted = [self.post_time_entry(entries[index], dry_run) for index in reserved]
+        for index, result in zip(reserved, posted):
+            results[index] = result
+
+        if entries:
+            print("%d of %d time entries added%s" % (results.count(True), len(results),
+                                                      ' (dry run)' if dry_run else ''))
+        return results
+
+    def add_to_entries(self, entry):
+        """
+        Add time entry to index of already registered entries.
+
+        :param entry: dictionary with entry data
+        :type entry: dict
+        """
+        self.entries.add(entry['date'], entry['project_id'], entry['activity_id'], entry['task_description'],
+                         entry['time_spent'])
+
     def convert_calendar_event_to_entry(self, event):
         """
         Convert Google Calendar event object to a dict object that will later be inserted to Economic.
@@ -124,9 +378,6 @@ class Economic(object):
         :type event: dict
         :param event:
         """
-        if not self.activities:
-            self.init_activities()
-
         try:
             start_date = datetime.strptime(event['start_date'][:19], "%Y-%m-%dT%H:%M:%S")
             end_date = datetime.strptime(event['end_date'][:19], "%Y-%m-%dT%H:%M:%S")
@@ -134,29 +385,44 @@ class Economic(object):
             return None
 
         time_spent = (end_date - start_date).total_seconds() / 3600
+        project_id = event.get('project_id', False) or self.config['default_project_id']
 
         entry = {
             'date': str(start_date.isoformat()[:-9]),
-            'project_id': event.get('project_id', False) or self.config['default_project_id'],
+            'project_id': project_id,
             'activity_id': event.get('activity_id'),
-            'task_description': self.get_description(event['title'], event.get('activity_id')),
+            'task_description': self.get_description(event['title'], event.get('activity_id'), project_id),
             'time_spent': str(time_spent).replace('.', ',')
         }
 
         return entry
 
-    def init_tasks(self):
+    def init_tasks(self, date=None):
         """
         Set list of tasks already registered in e-conomic.
 
-        This method fetches list of currently entered tasks and saves it as HTML (without parsing).
+        This method fetches list of currently entered tasks and adds them to index of entries.
         It will be later used to avoid entering duplicated entries.
+
+        :param date: datetime, current date is used when not given
+        """
+        date = date or self.date
+        url = (self.base_url + '/Secure/generelt/dataedit.asp?form=80&projektleder=&medarbid=' + self.medarbid +
+               '&mode=dag&dato=')
+        with metrics.phase('e-conomic day page'):
+            response = self.request('GET', url + "%s-%s-%s" % (date.day, date.month, date.year))
+        self.entries.load(date.isoformat()[:10], response.content.decode('utf8'))
+        self.loaded_days.add(date.isoformat()[:10])
+
+    def ensure_tasks(self, date):
+        """
+        Fetch tasks registered for given day unless they were already fetched.
+
+        :param date: date in format YYYY-MM-DD
+        :type date: str
         """
-        url = 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp?' \
-              'form=80&projektleder=&medarbid=' + self.medarbid + '&mode=dag&dato='
-        date = "%s-%s-%s" % (self.date.day, self.date.month, self.date.year)
-        response = self.session.get(url + date)
-        self.tasks_html = response.content.decode('utf8')
+        if str(date)[:10] not in self.loaded_days:
+            self.init_tasks(datetime.strptime(str(date)[:10], "%Y-%m-%d"))
 
     def init_medarbid(self):
         """
@@ -170,7 +436,7 @@ class Economic(object):
             self.medarbid = self.config['user_id']
             return
 
-        url = "https://secure.e-conomic.com/Secure/subnav.asp?subnum=10"
+        url = self.base_url + "/Secure/subnav.asp?subnum=10"
         response = self.session.get(url)
 
         medarbid = re.search(r'medarbid=(\d+)', response.content.decode('utf8'))
@@ -179,7 +445,7 @@ class Economic(object):
         else:
             raise RuntimeError('There is problem when trying to determine economic internal user id.')
 
-    def get_description(self, title, activity_id):
+    def get_description(self, title, activity_id, project_id=None):
         """
         Return description for given activity.
 
@@ -189,11 +455,18 @@ class Economic(object):
 
         :param title:
         :param activity_id:
+        :param project_id: project the activity belongs to, default project is used when not given
         :type title: str
         :type activity_id: int
         :return str
         """
-        default_activity = self.activities.get(int(activity_id), False)
+        project_id = int(project_id or self.config['default_project_id'])
+        activities = self.init_activities(project_id)
+        default_activity = activities.get(int(activity_id), False)
+        if default_activity is False and project_id in self.activities_from_cache:
+            # Cached activities might be outdated, so unknown activity is looked up again.
+            activities = self.init_activities(project_id, refresh=True)
+            default_activity = activities.get(int(activity_id), False)
         if default_activity is False:
             message = 'ERROR - No activity found with ID = %s' % str(activity_id)
             raise RuntimeError(message)
@@ -203,6 +476,6 @@ class Economic(object):
 
         description_format = self.config['description_format'].get(activity_id)
         description_format = description_format.replace('{CUSTOM}', title)
-        description_format = description_format.replace('{DEFAULT}', self.activities.get(int(activity_id), False))
+        description_format = description_format.replace('{DEFAULT}', default_activity)
 
         return description_format
@@ -0,0 +1,171 @@
+from collections import namedtuple
+try:
+    from HTMLParser import HTMLParser
+except ImportError:
+    from html.parser import HTMLParser
+
+
+TimeEntry = namedtuple('TimeEntry', ['date', 'project', 'activity', 'description', 'hours'])
+
+
+class EntryStore(object):
+
+    """
+    Index of time entries already registered in e-conomic.
+
+    Entries are indexed by day and normalized description, so checking
+    whether entry is duplicated doesn't depend on number of entries.
+
+    Layout of day page isn't documented, so entries table is parsed only when
+    its header row is recognised. Text and attribute values of every page are
+    kept too and entry is considered registered also when its description
+    (first 20 characters of it) is found there, e.g. when table layout changes.
+    """
+
+    # Number of description characters searched in text of page without entries table.
+    prefix_length = 20
+
+    def __init__(self):
+        """Init empty index."""
+        self.entries = {}
+        self.pages = {}
+
+    def __len__(self):
+        """Return number of indexed entries."""
+        return len(self.entries)
+
+    @staticmethod
+    def make_key(date, description):
+        """
+        Return index key for entry with given date and description.
+
+        Description is compared case insensitive and without redundant whitespaces.
+
+        :param date: date in format YYYY-MM-DD
+        :param description: str
+        :return: tuple
+        """
+        if isinstance(description, bytes):
+            description = description.decode('utf8')
+
+        return str(date)[:10], u' '.join(description.split()).lower()
+
+    def add(self, date, project, activity, description, hours):
+        """
+        Add entry to index.
+
+        :param date: date in format YYYY-MM-DD
+        :param project: project ID or name
+        :param activity: activity ID or name
+        :param description: str
+        :param hours: str
+        """
+        key = self.make_key(date, description)
+        self.entries[key] = TimeEntry(key[0], project, activity, key[1], hours)
+
+    def remove(self, date, description):
+        """
+        Remove entry from index.
+
+        :param date: date in format YYYY-MM-DD
+        :param description: str
+        """
+        self.entries.pop(self.make_key(date, description), None)
+
+    def contains(self, date, description):
+        """
+        Check whether entry with given date and description is already registered.
+
+        :param date: date in format YYYY-MM-DD
+        :param description: str
+        :return: bool
+        """
+        key = self.make_key(date, description)
+        if key in self.entries:
+            return True
+
+        # Index might miss entries when table of page isn't parsed correctly.
+        return key[0] in self.pages and key[1][:self.prefix_length] in self.pages[key[0]]
+
+    def load(self, date, html):
+        """
+        Parse e-conomic day page and add all entries found there to index.
+
+        :param date: date in format YYYY-MM-DD of day shown on page
+        :param html: page content
+        :type html: unicode
+        """
+        parser = EntryTableParser()
+        parser.feed(html)
+        parser.close()
+        for row in parser.rows:
+            self.add(date, row.project, row.activity, row.description, row.hours)
+        self.pages[str(date)[:10]] = self.make_key(date, u' '.join(parser.text))[1]
+
+
+class EntryTableParser(HTMLParser):
+
+    """
+    Parser extracting time entries from table on e-conomic day page.
+
+    Table rows are considered to be time entries only after header row
+    with names of all TimeEntry fields (in any order, other columns are
+    allowed), its columns are read by position of these names. Text and
+    attribute values of whole page are collected too.
+    """
+
+    def __init__(self):
+        """Init parser state."""
+        HTMLParser.__init__(self)
+        self.rows = []
+        self.text = []
+        self.row = None
+        self.cell = None
+        self.columns = None
+
+    def handle_starttag(self, tag, attrs):
+        """Start collecting row or cell data."""
+        self.text.extend(value for name, value in attrs if value)
+        if tag == 'tr':
+            self.row = []
+        elif tag in ('td', 'th') and self.row is not None:
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        """Finish collecting row or cell data."""
+        if tag in ('td', 'th') and self.cell is not None:
+            self.row.append(u' '.join(u''.join(self.cell).split()))
+            self.cell = None
+        elif tag == 'tr' and self.row is not None:
+            self.handle_row(self.row)
+            self.row = None
+        elif tag == 'table':
+            self.columns = None
+
+    def handle_row(self, row):
+        """
+        Recognise header row or add time entry read from columns of last header.
+
+        :param row: list of cell texts
+        """
+        names = [cell.lower() for cell in row]
+        if all(field in names for field in TimeEntry._fields):
+            self.columns = [names.index(field) for field in TimeEntry._fields]
+        elif self.columns is not None and len(row) > max(self.columns):
+            entry = TimeEntry(*[row[column] for column in self.columns])
+            if entry.description:
+                self.rows.append(entry)
+
+    def handle_data(self, data):
+        """Collect text of page and current cell."""
+        self.text.append(data)
+        if self.cell is not None:
+            self.cell.append(data)
+
+    def handle_entityref(self, name):
+        """Collect named character reference, not used when convert_charrefs is enabled."""
+        self.handle_data(self.unescape('&%s;' % name))
+
+    def handle_charref(self, name):
+        """Collect numeric character reference, not used when convert_charrefs is enabled."""
+        self.handle_data(self.unescape('&#%s;' % name))
@@ -0,0 +1,180 @@
+from file_cache import FileCache
+
+
+class EventStore(object):
+
+    """
+    Local copy of calendar events kept up to date with incremental sync.
+
+    Events are stored together with sync token needed to fetch next changes
+    and beginning of time range covered by copy.
+
+    :param directory: directory where events are saved
+    :param key: name of file with events
+    """
+
+    def __init__(self, directory, key):
+        """
+        Init empty store, saved events are read by load().
+
+        :type directory: str
+        :type key: str
+        """
+        self.cache = FileCache(directory)
+        self.key = key
+        self.since = None
+        self.sync_token = None
+        self.events = {}
+
+    def load(self):
+        """Read events saved by previous sync."""
+        data = self.cache.get(self.key) or {}
+        self.since = data.get('since')
+        self.sync_token = data.get('sync_token')
+        self.events = data.get('events', {})
+
+    def save(self):
+        """Save events together with sync token."""
+        self.cache.set(self.key, {'since': self.since, 'sync_token': self.sync_token, 'events': self.events})
+
+    def reset(self, since=None):
+        """
+        Remove all events before full sync.
+
+        :param since: beginning of time range fetched by full sync
+        """
+        self.since = since
+        self.sync_token = None
+        self.events = {}
+
+    def is_synced(self, start_date):
+        """
+        Check whether events since given date can be fetched incrementally.
+
+        :param start_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :return: bool
+        """
+        return bool(self.sync_token) and self.since is not None and self.since <= start_date
+
+    def update(self, events, sync_token):
+        """
+        Apply changed events, cancelled ones are removed.
+
+        :param events: iterable of dicts
+        :param sync_token: token to be used by next sync
+        """
+        for event in events:
+            if self.is_removed(event):
+                self.events.pop(self.get_id(event), None)
+            else:
+                self.events[self.get_id(event)] = event
+        self.sync_token = sync_token
+
+    def get_events(self, start_date, end_date):
+        """
+        Return events starting on days between given dates, ordered by start.
+
+        :param start_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :param end_date: date in format YYYY-MM-DDTHH:MM:SSZ, not included
+        :return: list
+        """
+        output = []
+        for event in self.events.values():
+            start = self.get_start(event)
+            if start_date[:10] <= start[:10] < end_date[:10]:
+                output.append(event)
+
+        return sorted(output, key=self.get_start)
+
+    @staticmethod
+    def get_id(event):
+        """
+        Return ID of Google Calendar event.
+
+        :param event: dict
+        :return: str
+        """
+        return event['id']
+
+    @staticmethod
+    def is_removed(event):
+        """
+        Check whether Google Calendar event was removed.
+
+        :param event: dict
+        :return: bool
+        """
+        return event.get('status') == 'cancelled'
+
+    @staticmethod
+    def get_start(event):
+        """
+        Return start of Google Calendar event, date is used for whole day events.
+
+        :param event: dict
+        :return: str
+        """
+        start = event.get('start', {})
+
+        return start.get('dateTime') or start.get('date') or ''
+
+
+class OutlookEventStore(EventStore):
+
+    """
+    Local copy of Office365 calendar view kept up to date with delta link.
+
+    Delta link is valid only for time range of calendar view it was returned for,
+    so range is saved as "since" and any other range needs full sync.
+    """
+
+    def is_synced(self, start_date, end_date=None):
+        """
+        Check whether events between given dates can be fetched incrementally.
+
+        :param start_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :param end_date: date in format YYYY-MM-DDTHH:MM:SSZ
+        :return: bool
+        """
+        return bool(self.sync_token) and self.since == self.get_range(start_date, end_date)
+
+    @staticmethod
+    def get_range(start_date, end_date):
+        """
+        Return time range of calendar view as single string.
+
+        :param start_date: str
+        :param end_date: str
+        :return: str
+        """
+        return '%s/%s' % (start_date, end_date)
+
+    @staticmethod
+    def get_id(event):
+        """
+        Return ID of Office365 event.
+
+        :param event: dict
+        :return: str
+        """
+        return event.get('Id') or event.get('id')
+
+    @staticmethod
+    def is_removed(event):
+        """
+        Check whether Office365 event was removed, removed events contain only ID and reason.
+
+        :param event: dict
+        :return: bool
+        """
+        return 'Reason' in event or '@removed' in event
+
+    @staticmethod
+    def get_start(event):
+        """
+        Return start of Office365 event.
+
+        :param event: dict
+        :return: str
+        """
+        return event.get('Start') or ''
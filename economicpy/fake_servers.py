@@ -0,0 +1,617 @@
+import datetime
+import hashlib
+import json
+import re
+import socket
+import threading
+import time
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+    from urllib import urlencode
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse, urlencode
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+
+    """Request handler passing all requests to server's dispatch()."""
+
+    # Connections are kept alive, as real APIs do.
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Handle GET request."""
+        self.server.dispatch(self)
+
+    def do_POST(self):
+        """Handle POST request."""
+        self.server.dispatch(self)
+
+    def log_message(self, format, *args):
+        """Don't print requests."""
+
+
+class FakeServer(ThreadingMixIn, HTTPServer):
+
+    """
+    Base class of in-process HTTP servers emulating e-conomic, JIRA, Google Calendar and Office365 APIs.
+
+    Server listens on random local port and is run in background thread, so real clients
+    can be pointed at it (see "base_url" and "api_url" options) to measure performance
+    without network. Errors returned instead of regular responses can be added with add_error().
+
+    Subclasses define "routes" - list of tuples with HTTP method, regexp matched
+    against path (case insensitive) and name of method returning tuple with status,
+    headers and body. Route methods are called with request handler, query and form data.
+
+    :param latency: number of seconds each response is delayed
+    :param page_size: maximum number of items returned in one page
+    :param size: number of items in dataset
+    """
+
+    daemon_threads = True
+    routes = []
+
+    def __init__(self, latency=0.0, page_size=50, size=100):
+        """
+        Bind server to random local port, it's started with start() method.
+
+        :type latency: float
+        :type page_size: int
+        :type size: int
+        """
+        HTTPServer.__init__(self, ('127.0.0.1', 0), FakeRequestHandler)
+        self.latency = latency
+        self.page_size = page_size
+        self.size = size
+        self.errors = []
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def __enter__(self):
+        """Start server."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop server."""
+        self.stop()
+
+    @property
+    def url(self):
+        """Base URL of server."""
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def start(self):
+        """
+        Start serving requests in background thread.
+
+        :return: FakeServer
+        """
+        self.thread = threading.Thread(target=self.serve_forever, name=self.__class__.__name__, args=(0.05,))
+        self.thread.daemon = True
+        self.thread.start()
+
+        return self
+
+    def stop(self):
+        """Stop server and close its socket."""
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join()
+            self.thread = None
+        # Kept-alive connections are closed, so threads waiting for next request can finish.
+        with self.lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+        deadline = time.time() + 1
+        while self.connections and time.time() < deadline:
+            time.sleep(0.01)
+        self.server_close()
+
+    def process_request(self, request, client_address):
+        """Remember open connection and handle it in separate thread."""
+        with self.lock:
+            self.connections.add(request)
+        ThreadingMixIn.process_request(self, request, client_address)
+
+    def shutdown_request(self, request):
+        """Forget closed connection."""
+        with self.lock:
+            self.connections.discard(request)
+        HTTPServer.shutdown_request(self, request)
+
+    def add_error(self, path_pattern, status=503, count=1, body='', headers=None):
+        """
+        Return given error instead of next responses for matching path.
+
+        :param path_pattern: regexp matched against path of request
+        :param status: HTTP status of error response
+        :param count: number of requests failed with this error
+        :param body: content of error response
+        :param headers: dict with additional headers, e.g. Retry-After
+        """
+        with self.lock:
+            self.errors.append([re.compile(path_pattern, re.I), count, status, headers or {}, body])
+
+    def get_error(self, path):
+        """
+        Return injected error response for given path or None.
+
+        :param path: str
+        :return: tuple|None
+        """
+        with self.lock:
+            for error in self.errors:
+                if error[0].search(path) and error[1] > 0:
+                    error[1] -= 1
+                    return error[2], error[3], error[4]
+
+        return None
+
+    def count_requests(self, path_pattern=''):
+        """
+        Return number of requests made for paths matching given regexp.
+
+        :param path_pattern: str
+        :return: int
+        """
+        pattern = re.compile(path_pattern, re.I)
+        with self.lock:
+            return len([path for method, path in self.requests if pattern.search(path)])
+
+    def dispatch(self, handler):
+        """
+        Find route matching request and send its response.
+
+        :param handler: FakeRequestHandler
+        """
+        parsed = urlparse(handler.path)
+        query = dict((key, values[-1]) for key, values in parse_qs(parsed.query, True).items())
+        length = int(handler.headers.get('Content-Length') or 0)
+        data = handler.rfile.read(length).decode('utf8') if length else ''
+        form = dict((key, values[-1]) for key, values in parse_qs(data, True).items())
+        with self.lock:
+            self.requests.append((handler.command, parsed.path))
+        if self.latency:
+            time.sleep(self.latency)
+
+        response = self.get_error(parsed.path)
+        if response is None:
+            response = 404, {}, 'Not found'
+            for method, path_pattern, name in self.routes:
+                match = re.search(path_pattern, parsed.path, re.I)
+                if method == handler.command and match:
+                    response = getattr(self, name)(handler, query, form, *match.groups())
+                    break
+
+        status, headers, body = response
+        if not isinstance(body, bytes):
+            body = body.encode('utf8')
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    @staticmethod
+    def json_response(data, status=200, headers=None):
+        """
+        Return response with given data encoded as JSON.
+
+        :param data: JSON serializable value
+        :param status: int
+        :param headers: dict
+        :return: tuple
+        """
+        headers = dict(headers or {})
+        headers['Content-Type'] = 'application/json'
+
+        return status, headers, json.dumps(data)
+
+    @staticmethod
+    def make_description(index, size):
+        """
+        Return event description with project and activity ID padded to given size.
+
+        :param index: number of event
+        :param size: minimum length of description
+        :return: str
+        """
+        description = 'Agenda of meeting %d\n#economic: 100\n#activity: 1\n' % index
+
+        return description + 'x' * max(0, size - len(description))
+
+
+class FakeEconomicServer(FakeServer):
+
+    """
+    Fake e-conomic web application.
+
+    Day page contains "size" already registered time entries and entries posted
+    to server. Password "wrong" makes login fail.
+
+    :param activities: number of activities returned for project
+    """
+
+    routes = [
+        ('POST', r'/secure/internal/login\.asp$', 'login'),
+        ('GET', r'/secure/subnav\.asp$', 'subnav'),
+        ('GET', r'/secure/generelt/dataedit\.asp$', 'day_page'),
+        ('GET', r'/secure/applet/fbsearch/fbsearch\.asp$', 'activities'),
+        ('POST', r'/secure/applet/df_doform\.asp$', 'post_entry'),
+    ]
+
+    def __init__(self, activities=10, **kwargs):
+        """
+        Init server with empty list of posted entries.
+
+        :type activities: int
+        """
+        FakeServer.__init__(self, **kwargs)
+        self.activities_count = activities
+        self.posted = []
+
+    def login(self, handler, query, form):
+        """Log in or show login error."""
+        if form.get('password') == 'wrong':
+            return 200, {}, '<body onload="location.href=?open=&fejlbesked=1&loginfejltype=4;">'
+
+        return 200, {'Set-Cookie': 'ASPSESSIONID=fake; Path=/'}, 'ok'
+
+    def subnav(self, handler, query, form):
+        """Return page with internal user ID."""
+        return 200, {}, '<a href="dataedit.asp?medarbid=1">Time</a>'
+
+    def day_page(self, handler, query, form):
+        """Return page with time entries registered for given day."""
+        day, month, year = [int(part) for part in query.get('dato', '1-1-1970').split('-')]
+        date = datetime.date(year, month, day).isoformat()
+        rows = ['<tr><th>Date</th><th>Project</th><th>Activity</th><th>Description</th><th>Hours</th></tr>']
+        for index in range(self.size):
+            rows.append('<tr><td>%s</td><td>100 Project</td><td>1 Meeting</td><td>Registered entry %d</td>'
+                        '<td>1,0</td></tr>' % (date, index))
+        with self.lock:
+            posted = [entry for entry in self.posted if entry.get('cs1', '')[:10] == date]
+        for entry in posted:
+            rows.append('<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td></tr>' % (
+                date, entry.get('cs2'), entry.get('cs3'), entry.get('cs6'), entry.get('cs7')))
+
+        return 200, {}, '<html><body><table>%s</table></body></html>' % ''.join(rows)
+
+    def activities(self, handler, query, form):
+        """Return activities of project."""
+        collection = [{'0': str(index), '1': 'Activity %d' % index} for index in range(1, self.activities_count + 1)]
+
+        return self.json_response({'collection': collection})
+
+    def post_entry(self, handler, query, form):
+        """Register time entry."""
+        with self.lock:
+            self.posted.append(form)
+
+        return 200, {}, '{"result": "ok"}'
+
+
+class FakeJiraServer(FakeServer):
+
+    """
+    Fake JIRA REST API, use server.url + '/rest/api/2/' as "api_url".
+
+    Each of "size" issues has "worklogs" worklog items registered today by given user,
+    search results contain at most 20 of them like real JIRA.
+
+    :param username: author of worklogs
+    :param economic_field: name of field with e-conomic project ID
+    :param worklogs: number of worklogs per issue
+    """
+
+    routes = [
+        ('GET', r'/search$', 'search'),
+        ('GET', r'/issue/([^/]+)/worklog$', 'worklog'),
+    ]
+
+    def __init__(self, username='user', economic_field='customfield_10000', worklogs=2, **kwargs):
+        """
+        Init server.
+
+        :type username: str
+        :type economic_field: str
+        :type worklogs: int
+        """
+        FakeServer.__init__(self, **kwargs)
+        self.username = username
+        self.economic_field = economic_field
+        self.worklogs = worklogs
+
+    def get_worklogs(self):
+        """
+        Return worklogs of single issue.
+
+        :return: list
+        """
+        started = datetime.datetime.now().isoformat()[:10] + 'T09:00:00.000+0000'
+
+        return [{'author': {'name': self.username}, 'started': started, 'timeSpentSeconds': 1800}
+                for _ in range(self.worklogs)]
+
+    def search(self, handler, query, form):
+        """Return page of issues."""
+        start_at = int(query.get('startAt') or 0)
+        max_results = min(int(query.get('maxResults') or 50), self.page_size)
+        fields = query.get('fields', '').split(',')
+        issues = []
+        for index in range(start_at, min(start_at + max_results, self.size)):
+            issue_fields = {'summary': 'Issue %d' % index, self.economic_field: {'value': '100 Project'}}
+            if 'worklog' in fields:
+                worklogs = self.get_worklogs()
+                issue_fields['worklog'] = {'startAt': 0, 'maxResults': 20, 'total': len(worklogs),
+                                           'worklogs': worklogs[:20]}
+            issues.append({'key': 'FAKE-%d' % index, 'fields': issue_fields})
+
+        return self.json_response({'startAt': start_at, 'maxResults': max_results, 'total': self.size,
+                                   'issues': issues})
+
+    def worklog(self, handler, query, form, key):
+        """Return worklog of issue."""
+        worklogs = self.get_worklogs()
+
+        return self.json_response({'startAt': 0, 'maxResults': len(worklogs), 'total': len(worklogs),
+                                   'worklogs': worklogs})
+
+
+class FakeGoogleServer(FakeServer):
+
+    """
+    Fake Google Calendar API v3, use server.url as "api_url".
+
+    Events of dataset start on day given by timeMin. Field mask ("fields" parameter)
+    is applied to fields of events. Sync tokens are valid until expire_sync_tokens()
+    is called, incremental sync returns no changes.
+
+    :param description_size: length of event descriptions
+    :param attendees: number of attendees of each event
+    """
+
+    routes = [
+        ('GET', r'/discovery/v1/apis/calendar/v3/rest$', 'discovery'),
+        ('GET', r'/calendar/v3/calendars/([^/]+)/events$', 'events'),
+    ]
+
+    def __init__(self, description_size=200, attendees=5, **kwargs):
+        """
+        Init server.
+
+        :type description_size: int
+        :type attendees: int
+        """
+        FakeServer.__init__(self, **kwargs)
+        self.description_size = description_size
+        self.attendees = attendees
+        self.sync_generation = 1
+
+    def expire_sync_tokens(self):
+        """Make all sync tokens returned so far invalid."""
+        with self.lock:
+            self.sync_generation += 1
+
+    def discovery(self, handler, query, form):
+        """Return discovery document describing events list method."""
+        parameters = {
+            'calendarId': {'type': 'string', 'location': 'path', 'required': True},
+            'maxResults': {'type': 'integer', 'location': 'query'},
+            'pageToken': {'type': 'string', 'location': 'query'},
+            'singleEvents': {'type': 'boolean', 'location': 'query'},
+            'syncToken': {'type': 'string', 'location': 'query'},
+            'timeMin': {'type': 'string', 'location': 'query'},
+            'timeMax': {'type': 'string', 'location': 'query'},
+        }
+
+        return self.json_response({
+            'kind': 'discovery#restDescription',
+            'name': 'calendar',
+            'version': 'v3',
+            'rootUrl': self.url + '/',
+            'servicePath': 'calendar/v3/',
+            'batchPath': 'batch/calendar/v3',
+            'parameters': {
+                'fields': {'type': 'string', 'location': 'query'},
+                'key': {'type': 'string', 'location': 'query'},
+                'alt': {'type': 'string', 'location': 'query', 'default': 'json'},
+            },
+            'resources': {'events': {'methods': {'list': {
+                'id': 'calendar.events.list',
+                'path': 'calendars/{calendarId}/events',
+                'httpMethod': 'GET',
+                'parameters': parameters,
+                'parameterOrder': ['calendarId'],
+                'response': {'$ref': 'Events'},
+            }}}},
+            'schemas': {'Events': {'id': 'Events', 'type': 'object'}},
+        })
+
+    def make_event(self, index, day):
+        """
+        Return event of dataset.
+
+        :param index: number of event
+        :param day: date in format YYYY-MM-DD
+        :return: dict
+        """
+        hour = 8 + index % 10
+        attendees = [{'email': 'user%d@example.com' % number, 'responseStatus': 'accepted'}
+                     for number in range(self.attendees - 1)]
+        attendees.append({'email': 'me@example.com', 'self': True, 'responseStatus': 'accepted'})
+
+        return {
+            'kind': 'calendar#event',
+            'id': 'event%d' % index,
+            'status': 'confirmed',
+            'htmlLink': 'https://www.google.com/calendar/event?eid=event%d' % index,
+            'summary': 'Meeting %d' % index,
+            'description': self.make_description(index, self.description_size),
+            'start': {'dateTime': '%sT%02d:00:00Z' % (day, hour)},
+            'end': {'dateTime': '%sT%02d:30:00Z' % (day, hour)},
+            'attendees': attendees,
+            'reminders': {'useDefault': True},
+            'conferenceData': {'entryPoints': [{'uri': 'https://meet.example.com/%d' % index}]},
+        }
+
+    @staticmethod
+    def get_item_fields(fields):
+        """
+        Return names of event fields selected by field mask, None when all fields are selected.
+
+        :param fields: field mask, e.g. "nextPageToken,items(id,start)"
+        :return: list|None
+        """
+        start = fields.find('items(')
+        if start == -1:
+            return None
+        names = []
+        depth = 0
+        name = ''
+        for char in fields[start + len('items('):]:
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            elif char == ',' and depth == 0:
+                names.append(name)
+                name = ''
+            elif depth == 0:
+                name += char
+        names.append(name)
+
+        return [name.strip() for name in names]
+
+    def events(self, handler, query, form, calendar_id):
+        """Return page of events."""
+        with self.lock:
+            generation = self.sync_generation
+        sync_token = 'sync-%d' % generation
+        if 'syncToken' in query:
+            if query['syncToken'] != sync_token:
+                return self.json_response({'error': {'code': 410, 'message': 'Sync token is no longer valid'}}, 410)
+            return self.json_response({'kind': 'calendar#events', 'items': [], 'nextSyncToken': sync_token})
+
+        offset = int(query.get('pageToken') or 0)
+        max_results = min(int(query.get('maxResults') or 250), self.page_size)
+        day = (query.get('timeMin') or '1970-01-01')[:10]
+        items = [self.make_event(index, day) for index in range(offset, min(offset + max_results, self.size))]
+        item_fields = self.get_item_fields(query.get('fields', ''))
+        if item_fields is not None:
+            items = [dict((key, value) for key, value in item.items() if key in item_fields) for item in items]
+        page = {'kind': 'calendar#events', 'summary': 'me@example.com', 'items': items}
+        if offset + max_results < self.size:
+            page['nextPageToken'] = str(offset + max_results)
+        else:
+            page['nextSyncToken'] = sync_token
+
+        return self.json_response(page)
+
+
+class FakeOutlookServer(FakeServer):
+
+    """
+    Fake Office365 calendar REST API, use server.url + '/api/v1.0/' as "api_url".
+
+    Supports $select, Prefer: odata.maxpagesize and odata.track-changes headers, ETag
+    of pages and delta links. Delta links are valid until expire_delta_links() is called,
+    incremental sync returns no changes.
+
+    :param description_size: length of event descriptions
+    :param attendees: number of attendees of each event
+    """
+
+    routes = [
+        ('GET', r'/api/v1\.0/me/calendarview$', 'calendar_view'),
+    ]
+
+    def __init__(self, description_size=200, attendees=5, **kwargs):
+        """
+        Init server.
+
+        :type description_size: int
+        :type attendees: int
+        """
+        FakeServer.__init__(self, **kwargs)
+        self.description_size = description_size
+        self.attendees = attendees
+        self.delta_generation = 1
+
+    def expire_delta_links(self):
+        """Make all delta links returned so far invalid."""
+        with self.lock:
+            self.delta_generation += 1
+
+    def make_event(self, index, day):
+        """
+        Return event of dataset.
+
+        :param index: number of event
+        :param day: date in format YYYY-MM-DD
+        :return: dict
+        """
+        hour = 8 + index % 10
+        attendees = [{'EmailAddress': {'Address': 'user%d@example.com' % number, 'Name': 'User %d' % number},
+                      'Status': {'Response': 'Accepted'}, 'Type': 'Required'} for number in range(self.attendees)]
+
+        return {
+            'Id': 'event%d' % index,
+            'Subject': 'Meeting %d' % index,
+            'Body': {'ContentType': 'Text', 'Content': self.make_description(index, self.description_size)},
+            'BodyPreview': self.make_description(index, 0)[:255],
+            'Start': '%sT%02d:00:00Z' % (day, hour),
+            'End': '%sT%02d:30:00Z' % (day, hour),
+            'ResponseStatus': {'Response': 'Accepted', 'Time': '%sT07:00:00Z' % day},
+            'Attendees': attendees,
+            'Location': {'DisplayName': 'Room %d' % index},
+            'Categories': [],
+        }
+
+    def calendar_view(self, handler, query, form):
+        """Return page of calendar view."""
+        with self.lock:
+            generation = self.delta_generation
+        path = '/api/v1.0/me/calendarview'
+        delta_link = '%s%s?%s' % (self.url, path, urlencode({'$deltatoken': 'delta-%d' % generation}))
+        if '$deltatoken' in query:
+            if query['$deltatoken'] != 'delta-%d' % generation:
+                return self.json_response({'error': {'code': 'SyncStateNotFound'}}, 410)
+            return self.json_response({'value': [], '@odata.deltaLink': delta_link})
+
+        prefer = handler.headers.get('Prefer', '')
+        max_page_size = re.search(r'odata\.maxpagesize=(\d+)', prefer)
+        page_size = min(int(max_page_size.group(1)), self.page_size) if max_page_size else self.page_size
+        skip = int(query.get('$skip') or 0)
+        day = (query.get('startDateTime') or '1970-01-01')[:10]
+        events = [self.make_event(index, day) for index in range(skip, min(skip + page_size, self.size))]
+        if query.get('$select'):
+            fields = query['$select'].split(',')
+            events = [dict((key, value) for key, value in event.items() if key in fields) for event in events]
+        page = {'value': events}
+        if skip + page_size < self.size:
+            next_query = dict(query, **{'$skip': str(skip + page_size)})
+            page['@odata.nextLink'] = '%s%s?%s' % (self.url, path, urlencode(sorted(next_query.items())))
+        elif 'odata.track-changes' in prefer:
+            page['@odata.deltaLink'] = delta_link
+
+        body = json.dumps(page, sort_keys=True)
+        etag = 'W/"%s"' % hashlib.sha1(body.encode('utf8')).hexdigest()
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, ''
+
+        return 200, {'Content-Type': 'application/json', 'ETag': etag}, body
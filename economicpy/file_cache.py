@@ -0,0 +1,105 @@
+import json
+import os
+import re
+import tempfile
+import time
+
+
+class FileCache(object):
+
+    """
+    Simple cache storing JSON serializable values as files in given directory.
+
+    Files are readable only by their owner, as cache might contain session data.
+
+    :param directory: str
+    """
+
+    def __init__(self, directory):
+        """
+        Set cache directory, it will be created when first value is saved.
+
+        :param directory: str
+        """
+        self.directory = directory
+
+    def get_path(self, key):
+        """
+        Return path of file with value for given key.
+
+        :param key: str
+        :return: str
+        """
+        return os.path.join(self.directory, re.sub(r'[^\w.-]', '_', key) + '.json')
+
+    def get(self, key, ttl=None):
+        """
+        Return cached value or None if it's missing, unreadable or older than ttl.
+
+        :param key: str
+        :param ttl: maximum age of value in seconds, None for no limit
+        :return: mixed
+        """
+        try:
+            with open(self.get_path(key)) as cache_file:
+                item = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if ttl is not None and time.time() - item['time'] > ttl:
+            return None
+
+        return item['value']
+
+    def set(self, key, value):
+        """
+        Save value for given key.
+
+        :param key: str
+        :param value: JSON serializable value
+        """
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory, 0o700)
+            except OSError:
+                if not os.path.isdir(self.directory):
+                    raise
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, delete=False) as cache_file:
+            json.dump({'time': time.time(), 'value': value}, cache_file)
+        # Temporary files are already created with 0600 mode, it's set here to be explicit.
+        os.chmod(cache_file.name, 0o600)
+        os.rename(cache_file.name, self.get_path(key))
+
+    def delete(self, key):
+        """
+        Remove value for given key from cache.
+
+        :param key: str
+        """
+        try:
+            os.remove(self.get_path(key))
+        except OSError:
+            pass
+
+    def prune(self, prefix, ttl):
+        """
+        Remove values of keys starting with given prefix which are older than ttl.
+
+        :param prefix: str
+        :param ttl: maximum age of values in seconds
+        """
+        prefix = re.sub(r'[^\w.-]', '_', prefix)
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            if not name.startswith(prefix) or not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if time.time() - os.path.getmtime(path) > ttl:
+                    os.remove(path)
+            except OSError:
+                pass
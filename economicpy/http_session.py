@@ -0,0 +1,37 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+from metrics import metrics
+
+
+def create_session(config, service=None):
+    """
+    Create requests session with connection pool and retry policy set in configuration.
+
+    Connections are kept alive and reused between requests. Requests that failed
+    with 429 or 503 status are retried with exponential backoff unless server
+    asks to wait longer with Retry-After header. Options used:
+    "pool_size" - maximum number of connections kept open per host,
+    "max_retries" - how many times failed request is retried,
+    "retry_backoff" - backoff factor in seconds.
+
+    :param config: dict
+    :param service: name of service used in metrics, requests are not recorded when not given
+    :return: requests.Session
+    """
+    retry = Retry(
+        total=int(config.get('max_retries') or 3),
+        backoff_factor=float(config.get('retry_backoff') or 0.5),
+        status_forcelist=(429, 503),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_maxsize=int(config.get('pool_size') or 10), max_retries=retry)
+
+    session = requests.session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if service is not None:
+        metrics.instrument_session(session, service)
+
+    return session
@@ -0,0 +1,88 @@
+import re
+
+
+class IdExtractor(object):
+
+    """
+    Extract e-conomic project and activity IDs from text.
+
+    Patterns are compiled once and text is lowercased once for both IDs. Patterns are
+    searched separately, as each of them starts with literal text which is found
+    much faster than combined pattern. Project ID is taken from last match of its
+    pattern, activity ID from first match of its pattern. Empty pattern means that
+    given ID is not supported and -1 is returned for it.
+
+    :param project_pattern: regexp with project ID in first group
+    :param activity_pattern: regexp with activity ID in first group
+    :param default_project_id: returned when project pattern doesn't match
+    :param default_activity_id: returned when activity pattern doesn't match
+    """
+
+    def __init__(self, project_pattern, activity_pattern, default_project_id=False, default_activity_id=False):
+        """
+        Compile patterns.
+
+        :type project_pattern: str
+        :type activity_pattern: str
+        """
+        self.default_project_id = default_project_id
+        self.default_activity_id = default_activity_id
+        self.project_pattern = re.compile(project_pattern) if project_pattern else None
+        self.activity_pattern = re.compile(activity_pattern) if activity_pattern else None
+
+    def extract(self, text):
+        """
+        Return project and activity ID found in given text.
+
+        :param text: str
+        :return: tuple
+        """
+        text = text.lower()
+
+        return self.find_project_id(text), self.find_activity_id(text)
+
+    def get_project_value(self, match):
+        """
+        Return matched project ID, whole match is used when pattern has no groups.
+
+        :param match: match object
+        :return: str
+        """
+        if self.project_pattern.groups:
+            return match.group(1)
+
+        return match.group(0)
+
+    def find_project_id(self, text):
+        """
+        Return project ID from last match of project pattern in lowercased text.
+
+        :param text: str
+        :return: int
+        """
+        if self.project_pattern is None:
+            return -1
+
+        project_id = None
+        for match in self.project_pattern.finditer(text):
+            project_id = self.get_project_value(match)
+        if project_id is not None:
+            return int(project_id)
+
+        return self.default_project_id
+
+    def find_activity_id(self, text):
+        """
+        Return activity ID from first match of activity pattern in lowercased text.
+
+        :param text: str
+        :return: int
+        """
+        if self.activity_pattern is None:
+            return -1
+
+        result = self.activity_pattern.search(text)
+        if result:
+            return int(result.group(1))
+
+        return self.default_activity_id
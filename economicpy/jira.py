@@ -1,7 +1,10 @@
 from __future__ import print_function
 import re
-import requests
 import datetime
+from multiprocessing.pool import ThreadPool
+from http_session import create_session
+from metrics import metrics
+from options import is_enabled
 
 
 class Jira(object):
@@ -23,6 +26,7 @@ class Jira(object):
             self.config[item[0]] = item[1]
 
         self.auth_data = (self.config['username'], self.config['password'])
+        self.session = create_session(self.config, 'jira')
 
     def make_request(self, uri):
         """
@@ -31,32 +35,110 @@ class Jira(object):
         :type uri: str
         :param uri:
         """
-        response = requests.get(self.config['api_url'] + uri, auth=self.auth_data)
+        response = self.session.get(self.config['api_url'] + uri, auth=self.auth_data)
         response.raise_for_status()
 
         return response.json()
 
     def get_tasks(self):
         """Generator returning all tasks assigned to current user that match filter specified in configuration."""
-        tasks = self.make_request(
-            'search?jql=' + self.config['search_query'] + '&fields=summary,' + self.config['economic_field']
-        )
-
-        for issue in tasks['issues']:
-            project_id = self.get_project_id(issue['fields'])
-            if not project_id:
-                print('ERROR - task %s is missing economic project ID' % (issue['key']))
-                continue
-
-            task = {
-                'date': datetime.datetime.now().isoformat()[:10],
-                'project_id': project_id,
-                'activity_id': self.get_activity_id(),
-                'task_description': '%s %s' % (issue['key'], issue['fields']['summary']),
-                'time_spent': str(self.get_hours(issue['key'])).replace('.', ',')
-            }
-
-            yield task
+        fields = 'summary,' + self.config['economic_field']
+        if is_enabled(self.config, 'inline_worklogs'):
+            fields += ',worklog'
+
+        for page in self.search(fields):
+            issues = []
+            for issue in page:
+                project_id = self.get_project_id(issue['fields'])
+                if not project_id:
+                    print('ERROR - task %s is missing economic project ID' % (issue['key']))
+                    continue
+                issues.append((issue, project_id))
+
+            hours = self.get_hours_of_issues([issue for issue, project_id in issues])
+            for issue, project_id in issues:
+                issue_hours = next(hours)
+                task = {
+                    'date': datetime.datetime.now().isoformat()[:10],
+                    'project_id': project_id,
+                    'activity_id': self.get_activity_id(),
+                    'task_description': '%s %s' % (issue['key'], issue['fields']['summary']),
+                    'time_spent': str(issue_hours).replace('.', ',')
+                }
+
+                yield task
+
+    def search(self, fields):
+        """
+        Generator returning pages of issues matching search query from configuration.
+
+        Page size is set by "search_page_size" option. Next page is fetched
+        in background while current one is being processed.
+
+        :param fields: comma separated list of fields to be returned
+        :type fields: str
+        """
+        # Query is user supplied text which may contain "%", so it's never used as format string.
+        uri = 'search?jql=' + self.config['search_query'] + '&fields=' + fields + \
+              '&maxResults=%d' % int(self.config.get('search_page_size') or 50)
+        pool = None
+        try:
+            start_at = 0
+            page = self.make_request(uri + '&startAt=%d' % start_at)
+            while True:
+                start_at += len(page['issues'])
+                next_page = None
+                if page['issues'] and start_at < page['total']:
+                    pool = pool or ThreadPool(1)
+                    next_page = pool.apply_async(self.make_request, (uri + '&startAt=%d' % start_at,))
+
+                yield page['issues']
+
+                if next_page is None:
+                    break
+                page = next_page.get()
+        finally:
+            if pool:
+                pool.terminate()
+
+    def get_hours_of_issues(self, issues):
+        """
+        Generator returning hours registered for given issues, in same order as issues.
+
+        Worklogs are fetched in parallel when "worklog_workers" option is greater than 1.
+
+        :param issues: list of issues returned by search
+        :type issues: list
+        """
+        workers = min(int(self.config.get('worklog_workers') or 1), len(issues))
+        if workers <= 1:
+            for issue in issues:
+                yield self.get_issue_hours(issue)
+            return
+
+        pool = ThreadPool(workers)
+        try:
+            for hours in pool.imap(self.get_issue_hours, issues):
+                yield hours
+        finally:
+            pool.terminate()
+
+    def get_issue_hours(self, issue):
+        """
+        Get sum of hours registered for issue returned by search.
+
+        Worklog embedded in search result is used when it's complete, otherwise
+        separate API call is made for issue's worklog.
+
+        :param issue: issue returned by search
+        :type issue: dict
+        :return float
+        """
+        worklog = issue['fields'].get('worklog')
+        if worklog and len(worklog['worklogs']) >= worklog['total']:
+            return self.count_hours(worklog['worklogs'])
+
+        return self.get_hours(issue['key'])
 
     def get_hours(self, issue):
         """
@@ -65,10 +147,19 @@ class Jira(object):
         :param issue:
         :return float
         """
+        return self.count_hours(self.get_worklog(issue))
+
+    def count_hours(self, worklogs):
+        """
+        Sum hours registered today by current user in given worklogs.
+
+        :param worklogs: list
+        :return float
+        """
         hours = 0.0
 
         now = str(datetime.datetime.now())[:10]
-        for worklog in self.get_worklog(issue):
+        for worklog in worklogs:
             if worklog['author']['name'] == self.config['username'] and worklog['started'].startswith(now):
                 hours += worklog['timeSpentSeconds']
 
@@ -82,7 +173,8 @@ class Jira(object):
         :type issue_id: str
         :return list
         """
-        return self.make_request('issue/%s/worklog' % issue_id)['worklogs']
+        with metrics.phase('JIRA worklogs'):
+            return self.make_request('issue/%s/worklog' % issue_id)['worklogs']
 
     def get_project_id(self, fields):
         """
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+
+    """
+    Thread safe in-memory cache holding limited number of most recently used values.
+
+    :param maxsize: int
+    """
+
+    def __init__(self, maxsize):
+        """
+        Init empty cache.
+
+        :param maxsize: maximum number of values kept in cache
+        :type maxsize: int
+        """
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        """Return number of cached values."""
+        return len(self.items)
+
+    def __contains__(self, key):
+        """Check whether value for given key is cached."""
+        return key in self.items
+
+    def get(self, key, loader=None):
+        """
+        Return cached value, loading it with given function when it's missing.
+
+        Loader is called while cache is locked, so value for given key
+        is loaded only once even when requested from many threads.
+
+        :param key: hashable key
+        :param loader: function called with key to load missing value
+        :return: cached value or None if it's missing and loader was not given
+        """
+        with self.lock:
+            if key in self.items:
+                value = self.items.pop(key)
+                self.items[key] = value
+                return value
+            if loader is None:
+                return None
+            value = loader(key)
+            self.set(key, value)
+
+            return value
+
+    def set(self, key, value):
+        """
+        Save value, least recently used one is removed when cache is full.
+
+        :param key: hashable key
+        :param value: mixed
+        """
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = value
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached values."""
+        with self.lock:
+            self.items.clear()
@@ -0,0 +1,237 @@
+from __future__ import print_function
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse
+
+
+class Metrics(object):
+
+    """
+    Thread safe collector of run metrics.
+
+    Durations of phases of run are summed up (phase might be entered many times,
+    also from many threads). Requests are grouped by service and endpoint, which is
+    path of URL with IDs replaced with "{id}".
+
+    :param buckets: upper bounds of latency histogram buckets in seconds
+    """
+
+    def __init__(self, buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)):
+        """
+        Init empty metrics.
+
+        :type buckets: tuple
+        """
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.phases = OrderedDict()
+        self.requests = OrderedDict()
+        self.listeners = []
+
+    def add_listener(self, listener):
+        """
+        Register function called with name and duration of every finished phase.
+
+        :param listener: callable
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregister function registered with add_listener().
+
+        :param listener: callable
+        """
+        self.listeners.remove(listener)
+
+    def reset(self):
+        """Forget all collected metrics."""
+        with self.lock:
+            self.phases.clear()
+            self.requests.clear()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager measuring duration of phase of run.
+
+        :param name: str
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.time() - start)
+
+    def add_phase(self, name, seconds):
+        """
+        Add duration of phase.
+
+        :param name: str
+        :param seconds: float
+        """
+        with self.lock:
+            phase = self.phases.setdefault(name, {'seconds': 0.0, 'count': 0})
+            phase['seconds'] += seconds
+            phase['count'] += 1
+        for listener in list(self.listeners):
+            listener(name, seconds)
+
+    @staticmethod
+    def get_endpoint(url):
+        """
+        Return endpoint of given URL.
+
+        :param url: str
+        :return: str
+        """
+        parts = []
+        for part in (urlparse(url).path.lower() or '/').split('/'):
+            # IDs, issue keys and e-mails are replaced, API versions are kept.
+            if '@' in part or (re.search(r'\d', part) and len(part) > 3 and not re.match(r'^v\d+(\.\d+)?$', part)):
+                part = '{id}'
+            parts.append(part)
+
+        return '/'.join(parts)
+
+    def add_request(self, service, url, seconds, status, received=0, sent=0, retries=0):
+        """
+        Record finished request.
+
+        :param service: name of service, e.g. "jira"
+        :param url: requested URL
+        :param seconds: latency of request
+        :param status: HTTP status of response
+        :param received: number of bytes received
+        :param sent: number of bytes sent
+        :param retries: number of retries made before response was received
+        """
+        key = (service, self.get_endpoint(url))
+        with self.lock:
+            if key not in self.requests:
+                self.requests[key] = {'count': 0, 'errors': 0, 'retries': 0, 'bytes_received': 0, 'bytes_sent': 0,
+                                      'seconds': 0.0, 'buckets': [0] * len(self.buckets)}
+            endpoint = self.requests[key]
+            endpoint['count'] += 1
+            endpoint['errors'] += 1 if int(status) >= 400 else 0
+            endpoint['retries'] += retries
+            endpoint['bytes_received'] += received
+            endpoint['bytes_sent'] += sent
+            endpoint['seconds'] += seconds
+            for index, bucket in enumerate(self.buckets):
+                if seconds <= bucket:
+                    endpoint['buckets'][index] += 1
+
+    def instrument_session(self, session, service):
+        """
+        Record all requests made by requests session.
+
+        :param session: requests.Session
+        :param service: name of service
+        """
+        def record(response, *args, **kwargs):
+            retries = getattr(response.raw, 'retries', None)
+            body = response.request.body or ''
+            self.add_request(service, response.url, response.elapsed.total_seconds(), response.status_code,
+                             len(response.content or b''), len(body),
+                             len(retries.history) if retries is not None else 0)
+
+        session.hooks['response'].append(record)
+
+    def to_dict(self):
+        """
+        Return all metrics as dict that can be encoded as JSON.
+
+        :return: dict
+        """
+        with self.lock:
+            requests = []
+            for (service, endpoint), data in self.requests.items():
+                request = {'service': service, 'endpoint': endpoint}
+                request.update(data)
+                request['buckets'] = OrderedDict(zip([str(bucket) for bucket in self.buckets], data['buckets']))
+                requests.append(request)
+
+            return {'phases': json.loads(json.dumps(self.phases)), 'requests': requests}
+
+    def to_json(self):
+        """
+        Return metrics encoded as JSON.
+
+        :return: str
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix='economicpy'):
+        """
+        Return metrics in Prometheus text format.
+
+        :param prefix: prefix of names of metrics
+        :return: str
+        """
+        data = self.to_dict()
+        lines = [
+            '# HELP %s_phase_seconds Time spent in phase of run.' % prefix,
+            '# TYPE %s_phase_seconds gauge' % prefix,
+        ]
+        for name, phase in data['phases'].items():
+            lines.append('%s_phase_seconds{phase="%s"} %f' % (prefix, name, phase['seconds']))
+
+        counters = [
+            ('requests_total', 'count', 'Number of HTTP requests.'),
+            ('request_errors_total', 'errors', 'Number of HTTP responses with error status.'),
+            ('request_retries_total', 'retries', 'Number of retried HTTP requests.'),
+            ('received_bytes_total', 'bytes_received', 'Number of bytes received.'),
+            ('sent_bytes_total', 'bytes_sent', 'Number of bytes sent.'),
+        ]
+        for name, field, description in counters:
+            lines.append('# HELP %s_http_%s %s' % (prefix, name, description))
+            lines.append('# TYPE %s_http_%s counter' % (prefix, name))
+            for request in data['requests']:
+                lines.append('%s_http_%s{service="%s",endpoint="%s"} %d' % (
+                    prefix, name, request['service'], request['endpoint'], request[field]))
+
+        name = '%s_http_request_duration_seconds' % prefix
+        lines.append('# HELP %s Latency of HTTP requests.' % name)
+        lines.append('# TYPE %s histogram' % name)
+        for request in data['requests']:
+            labels = 'service="%s",endpoint="%s"' % (request['service'], request['endpoint'])
+            for bucket, count in request['buckets'].items():
+                lines.append('%s_bucket{%s,le="%s"} %d' % (name, labels, bucket, count))
+            lines.append('%s_bucket{%s,le="+Inf"} %d' % (name, labels, request['count']))
+            lines.append('%s_sum{%s} %f' % (name, labels, request['seconds']))
+            lines.append('%s_count{%s} %d' % (name, labels, request['count']))
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, prometheus=False):
+        """
+        Write metrics to file, "-" prints them.
+
+        File is replaced atomically, so node exporter never reads partially written file.
+
+        :param path: str
+        :param prometheus: whether Prometheus text format should be used instead of JSON
+        """
+        content = self.to_prometheus() if prometheus else self.to_json() + '\n'
+        if path == '-':
+            print(content, end='')
+            return
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as metrics_file:
+            metrics_file.write(content)
+        os.chmod(metrics_file.name, 0o644)
+        os.rename(metrics_file.name, path)
+
+
+metrics = Metrics()
@@ -0,0 +1,22 @@
+import os
+
+
+def is_enabled(config, name):
+    """
+    Check whether yes/no option is enabled, same values as in ConfigParser.getboolean() mean yes.
+
+    :param config: dict
+    :param name: name of option
+    :return: bool
+    """
+    return str(config.get(name) or '').lower() in ('1', 'yes', 'true', 'on')
+
+
+def get_cache_dir(config):
+    """
+    Return directory set in "cache_dir" option, ~/.economic-py is used when it's empty.
+
+    :param config: dict
+    :return: str
+    """
+    return config.get('cache_dir') or os.path.expanduser('~/.economic-py')
@@ -0,0 +1,218 @@
+import sys
+import threading
+import time
+import six
+from scheduler import name_error
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+
+END = object()
+
+
+class Pipeline(object):
+
+    """
+    Items produced by sources flow through stages run in separate threads.
+
+    Sources and stages are connected with bounded queues. When queue is full
+    previous stage waits, so number of items kept in memory doesn't depend
+    on number of items produced. Stage function returns processed item
+    or None if item should be dropped.
+
+    Error in stage stops whole pipeline. Error in source (other than exit or interrupt)
+    stops only that source, items of other sources are still processed and error is
+    raised at the end.
+
+    :param queue_size: maximum number of items waiting between two stages
+    :param stop_timeout: maximum number of seconds threads are waited for when pipeline is stopped
+    """
+
+    # Blocking get() can't be interrupted with Ctrl+C on Python 2, so run() waits for items in chunks.
+    wait_timeout = 1.0
+
+    def __init__(self, queue_size=100, stop_timeout=1.0):
+        """
+        Create pipeline without any sources and stages.
+
+        :param queue_size: int
+        :param stop_timeout: float
+        """
+        self.queue_size = queue_size
+        self.stop_timeout = stop_timeout
+        self.sources = []
+        self.stages = []
+        self.stopped = threading.Event()
+        self.error = None
+        self.lock = threading.Lock()
+        self.writers = []
+        self.queues = []
+
+    def add_source(self, name, iterable):
+        """
+        Add iterable which items are passed to first stage, each source is read in separate thread.
+
+        :param name: str
+        :param iterable: iterable
+        """
+        self.sources.append((name, iterable))
+
+    def add_stage(self, name, function, workers=1):
+        """
+        Add stage processing items returned by previous stage or sources.
+
+        :param name: str
+        :param function: function called with item, returns processed item or None
+        :param workers: number of threads processing items, order of items is kept only for single worker
+        """
+        self.stages.append((name, function, workers))
+
+    def run(self):
+        """Generator returning items processed by last stage."""
+        self.queues = queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        self.writers = [len(self.sources)] + [workers for name, function, workers in self.stages]
+        threads = []
+        for name, iterable in self.sources:
+            threads.append(threading.Thread(target=self.produce, name=name, args=(name, iterable, queues[0])))
+        for index, (name, function, workers) in enumerate(self.stages):
+            for worker in range(workers):
+                threads.append(threading.Thread(target=self.process, name='%s-%d' % (name, worker),
+                                                args=(name, function, queues[index], queues[index + 1], index + 1)))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while not self.stopped.is_set():
+                try:
+                    item = queues[-1].get(timeout=self.wait_timeout)
+                except queue.Empty:
+                    continue
+                if item is END:
+                    break
+                yield item
+        finally:
+            self.stop(queues, threads)
+
+        if self.error is not None:
+            name, (error_type, error, traceback) = self.error
+            six.reraise(error_type, name_error(error, name), traceback)
+
+    def produce(self, name, iterable, output):
+        """
+        Put all items of source to first queue.
+
+        :param name: name of source
+        :param iterable: iterable
+        :param output: Queue
+        """
+        try:
+            for item in iterable:
+                if self.stopped.is_set():
+                    return
+                output.put(item)
+        except Exception:
+            # Other sources are still read, error is raised when their items are processed.
+            self.record_error(name)
+        except BaseException:
+            self.fail(name)
+            return
+        self.finish(output, 0)
+
+    def process(self, name, function, input_queue, output, index):
+        """
+        Process items from input queue until all previous stages are finished.
+
+        :param name: name of stage
+        :param function: stage function
+        :param input_queue: Queue
+        :param output: Queue
+        :param index: number of output queue
+        """
+        while True:
+            item = input_queue.get()
+            if self.stopped.is_set():
+                return
+            if item is END:
+                # Other workers of this stage have to be notified too.
+                input_queue.put(END)
+                break
+            try:
+                item = function(item)
+            except BaseException:
+                self.fail(name)
+                return
+            # Stage function might have been running (e.g. waiting for HTTP response) when pipeline was stopped.
+            if self.stopped.is_set():
+                return
+            if item is not None:
+                output.put(item)
+        self.finish(output, index)
+
+    def finish(self, output, index):
+        """
+        Mark one writer of queue as finished, last one marks end of items in queue.
+
+        :param output: Queue
+        :param index: number of queue
+        """
+        with self.lock:
+            self.writers[index] -= 1
+            last = self.writers[index] == 0
+        if last and not self.stopped.is_set():
+            output.put(END)
+
+    def record_error(self, name):
+        """
+        Save error being handled, first error is raised by run() with its original traceback.
+
+        :param name: name of source or stage error was raised in
+        """
+        with self.lock:
+            if self.error is None:
+                self.error = (name, sys.exc_info())
+
+    def fail(self, name):
+        """
+        Stop whole pipeline because of error being handled.
+
+        :param name: name of stage error was raised in
+        """
+        self.record_error(name)
+        self.stopped.set()
+        # Wake up run() if it waits for next item. Full queue means it doesn't wait and
+        # blocking put() might never return, as stop() keeps filling emptied queues with END.
+        try:
+            self.queues[-1].put_nowait(END)
+        except queue.Full:
+            pass
+
+    def stop(self, queues, threads):
+        """
+        Stop all threads of pipeline.
+
+        Threads might wait for items or for free space in queues, so queues are
+        emptied (and END is put there) until all threads are finished or stop_timeout
+        passes. Once pipeline is stopped threads don't put anything to queues, so
+        threads busy in source or stage function (e.g. waiting for HTTP response)
+        finish on their own as soon as the function returns.
+
+        :param queues: list of Queue
+        :param threads: list of Thread
+        """
+        self.stopped.set()
+        deadline = time.time() + self.stop_timeout
+        while [thread for thread in threads if thread.is_alive()] and time.time() < deadline:
+            for waiting in queues:
+                try:
+                    while True:
+                        waiting.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    waiting.put_nowait(END)
+                except queue.Full:
+                    pass
+            time.sleep(0.01)
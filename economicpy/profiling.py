@@ -0,0 +1,166 @@
+from __future__ import print_function
+import cProfile
+import pstats
+import threading
+from metrics import metrics
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Profiler(object):
+
+    """
+    CPU profiler of whole run, optionally tracing memory at phase boundaries.
+
+    All threads started while profiler is running (pipeline stages, background jobs,
+    thread pools) are profiled too and their statistics are merged. Memory is traced
+    with tracemalloc, on Python without it only peak memory usage is reported.
+
+    :param path: path of file pstats statistics are saved to
+    :param top: number of functions printed in summary
+    :param trace_memory: whether memory snapshots should be taken at phase boundaries
+    """
+
+    # Memory snapshots are taken when these phases are finished.
+    boundaries = {
+        'e-conomic login': 'after login',
+        'calendar fetch': 'after calendar fetch',
+        'JIRA fetch': 'after JIRA',
+        'export': 'after submission',
+    }
+
+    def __init__(self, path, top=25, trace_memory=False):
+        """
+        Prepare profiler, it's started with start() method.
+
+        :type path: str
+        :type top: int
+        :type trace_memory: bool
+        """
+        self.path = path
+        self.top = top
+        self.trace_memory = trace_memory
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+        self.snapshots = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        """Start profiling."""
+        self.start()
+
+        return self
+
+    def __exit__(self, *args):
+        """Stop profiling and save results."""
+        self.stop()
+
+    def start(self):
+        """Start profiling current and new threads."""
+        if self.trace_memory:
+            if tracemalloc is not None:
+                tracemalloc.start()
+            metrics.add_listener(self.on_phase)
+        threading.setprofile(self.profile_thread)
+        self.profile.enable()
+
+    def profile_thread(self, frame, event, arg):
+        """
+        Start profiling new thread, called by first profiling event in thread.
+
+        Profiler enabled here replaces this function for given thread.
+        """
+        profile = cProfile.Profile()
+        with self.lock:
+            self.thread_profiles.append(profile)
+        profile.enable()
+
+    def stop(self):
+        """Stop profiling, save statistics and print summary."""
+        self.profile.disable()
+        threading.setprofile(None)
+        if self.trace_memory:
+            metrics.remove_listener(self.on_phase)
+
+        stats = pstats.Stats(self.profile)
+        with self.lock:
+            for profile in self.thread_profiles:
+                profile.disable()
+                try:
+                    stats.add(profile)
+                except TypeError:
+                    # Thread was started but didn't call any function.
+                    pass
+        stats.dump_stats(self.path)
+        print("Profile saved to %s, %d hottest functions:" % (self.path, self.top))
+        stats.sort_stats('tottime').print_stats(self.top)
+
+        if self.trace_memory:
+            self.print_memory()
+            if tracemalloc is not None:
+                tracemalloc.stop()
+
+    def on_phase(self, name, seconds):
+        """
+        Take memory snapshot when phase being boundary of run is finished.
+
+        :param name: name of phase
+        :param seconds: duration of phase
+        """
+        if name in self.boundaries:
+            self.take_snapshot(self.boundaries[name])
+
+    def take_snapshot(self, label):
+        """
+        Take memory snapshot, it's saved next to pstats file when tracemalloc is available.
+
+        :param label: name of snapshot
+        """
+        with self.lock:
+            number = len(self.snapshots) + 1
+        if tracemalloc is not None:
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot.dump('%s.%d.snapshot' % (self.path, number))
+        else:
+            snapshot = None
+            current = None
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource is not None else None
+        with self.lock:
+            self.snapshots.append((label, snapshot, current, peak))
+
+    def print_memory(self):
+        """Print memory usage at phase boundaries and biggest allocations since previous boundary."""
+        if tracemalloc is None:
+            print("tracemalloc is not available, only peak memory usage of process is reported.")
+        previous = None
+        for label, snapshot, current, peak in self.snapshots:
+            print("Memory %s: current %s, peak %s" % (label, self.format_size(current), self.format_size(peak)))
+            if snapshot is None:
+                continue
+            if previous is None:
+                differences = snapshot.statistics('lineno')
+            else:
+                differences = snapshot.compare_to(previous, 'lineno')
+            for statistic in differences[:5]:
+                print("    %s" % statistic)
+            previous = snapshot
+
+    @staticmethod
+    def format_size(size):
+        """
+        Return size in bytes formatted for humans.
+
+        :param size: int|None
+        :return: str
+        """
+        if size is None:
+            return 'unknown'
+
+        return '%.1f MB' % (size / 1024.0 / 1024.0)
@@ -0,0 +1,87 @@
+import sys
+import threading
+import six
+
+
+class Job(threading.Thread):
+
+    """
+    Function run in background thread, its result or error is passed to thread waiting for it.
+
+    :param name: name of job used in error messages
+    :param function: function to be run
+    """
+
+    # Blocking join() can't be interrupted with Ctrl+C on Python 2, so get() waits in chunks.
+    wait_timeout = 1.0
+
+    def __init__(self, name, function, *args, **kwargs):
+        """
+        Prepare job, it's started with start() method.
+
+        :param name: str
+        :param function: callable
+        """
+        super(Job, self).__init__(name=name)
+        self.daemon = True
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+
+    def run(self):
+        """Run function and save its result or raised exception."""
+        try:
+            self.result = self.function(*self.args, **self.kwargs)
+        except BaseException:
+            error_type, error, traceback = sys.exc_info()
+            self.error = (error_type, name_error(error, self.name), traceback)
+
+    def get(self):
+        """
+        Wait for job to finish and return its result.
+
+        :raise: exception raised by function is raised again in waiting thread, with its original traceback
+        :return: mixed
+        """
+        while self.is_alive():
+            self.join(self.wait_timeout)
+        if self.error is not None:
+            six.reraise(*self.error)
+
+        return self.result
+
+
+def start_job(name, function, *args, **kwargs):
+    """
+    Start running function in background.
+
+    :param name: name of job used in error messages
+    :param function: function to be run
+    :return: Job
+    """
+    job = Job(name, function, *args, **kwargs)
+    job.start()
+
+    return job
+
+
+def name_error(error, name):
+    """
+    Prefix message of error with name of job or pipeline stage it was raised in.
+
+    Type of error is kept, so it can still be handled by callers. Only errors with
+    single argument (message or wrapped error) are changed, exits and interrupts
+    are left as they are.
+
+    :param error: BaseException
+    :param name: str
+    :return: BaseException
+    """
+    if isinstance(error, Exception) and len(error.args) == 1:
+        # Unicode message is used directly, str() of error would fail for non-ASCII one on Python 2.
+        message = error.args[0] if isinstance(error.args[0], six.string_types) else error
+        error.args = ('%s: %s' % (name, message),)
+
+    return error
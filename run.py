@@ -2,100 +2,246 @@
 from __future__ import print_function
 import ConfigParser
 import datetime
+import importlib
 import os
 import click
 import sys
 import requests.packages.urllib3
-from economicpy.calendar_google import CalendarGoogle
 from economicpy.jira import Jira
 from economicpy.economic import Economic
 from economicpy.config_check import ConfigCheck
-from economicpy.calendar_outlook import CalendarOutlook
+from economicpy.metrics import metrics
+from economicpy.pipeline import Pipeline
+from economicpy.profiling import Profiler
+from economicpy.scheduler import start_job
 
 requests.packages.urllib3.disable_warnings()
 
+# Calendar providers are imported only when selected in config file, so dependencies
+# of other providers (e.g. Google API client) aren't loaded.
+CALENDAR_PROVIDERS = {
+    'Google': 'economicpy.calendar_google.CalendarGoogle',
+    'Office365': 'economicpy.calendar_outlook.CalendarOutlook',
+}
+
 
 @click.command()
 @click.option('--dry-run', is_flag=True, default=False, help='Simulated run without creating new entries.')
 @click.option('--date', default=None, help='Date in format YYYY-MM-DD for which data should be used.')
-def run(dry_run=False, date=None):
+@click.option('--since', default=None, help='First day (YYYY-MM-DD) of date range to be exported.')
+@click.option('--until', default=None, help='Last day (YYYY-MM-DD) of date range to be exported, defaults to today.')
+@click.option('--refresh-cache', is_flag=True, default=False, help='Ignore cached e-conomic data and fetch it again.')
+@click.option('--metrics', 'metrics_file', default=None,
+              help='File JSON summary of phase durations and HTTP requests is written to, "-" prints it.')
+@click.option('--metrics-prometheus', default=None, help='File metrics are written to in Prometheus text format.')
+@click.option('--profile', default=None, help='File CPU profile (pstats) of run is written to.')
+@click.option('--profile-top', default=25, help='Number of hottest functions printed after profiled run.')
+@click.option('--trace-memory', is_flag=True, default=False,
+              help='Take memory snapshots after login, calendar fetch, JIRA and submission (requires --profile).')
+def run(dry_run=False, date=None, since=None, until=None, refresh_cache=False, metrics_file=None,
+        metrics_prometheus=None, profile=None, profile_top=25, trace_memory=False):
     """
     Main function to be run in order to export data to e-conomic.
 
     :param dry_run: Simulated run without creating new entries in e-conomic
     :param date: date in format YYYY-MM-DD
+    :param since: first day of date range in format YYYY-MM-DD
+    :param until: last day of date range in format YYYY-MM-DD
+    :param refresh_cache: whether to ignore cached e-conomic data
+    :param metrics_file: path of JSON file with metrics, "-" for standard output
+    :param metrics_prometheus: path of file with metrics in Prometheus text format
+    :param profile: path of file with CPU profile
+    :param profile_top: number of hottest functions printed after profiled run
+    :param trace_memory: whether memory snapshots should be taken at phase boundaries
     """
+    if date and (since or until):
+        sys.exit("Option --date can't be used together with --since/--until")
+    if trace_memory and not profile:
+        sys.exit("Option --trace-memory can be used only together with --profile")
     try:
-        if date:
-            date = datetime.datetime.strptime(str(date), "%Y-%m-%d")
-        else:
-            date = datetime.datetime.now()
+        dates = get_dates(date, since, until)
     except ValueError:
         sys.exit("Incorrect date format used. Expected: YYYY-MM-DD")
+    if not dates:
+        sys.exit("Incorrect date range used: --since is after --until")
 
     if dry_run:
         print("This is just dry run, no changes will be made.")
-    print("Running export for %s:" % date.isoformat()[:10])
+    if len(dates) == 1:
+        print("Running export for %s:" % dates[0].isoformat()[:10])
+    else:
+        print("Running export for %s - %s:" % (dates[0].isoformat()[:10], dates[-1].isoformat()[:10]))
 
     src_path = os.path.abspath(os.path.dirname(__file__))
     config = get_configuration(src_path)
-    economic = Economic(config.items('Economic'), date)
+    profiler = Profiler(profile, profile_top, trace_memory) if profile else None
+    if profiler:
+        profiler.start()
+    try:
+        export(config, src_path, dates, dry_run, refresh_cache)
+    finally:
+        if profiler:
+            profiler.stop()
+        # Metrics are written also for failed runs, as they help to find out why run failed.
+        if metrics_file:
+            metrics.write(metrics_file)
+        if metrics_prometheus:
+            metrics.write(metrics_prometheus, prometheus=True)
+
+
+def export(config, src_path, dates, dry_run, refresh_cache=False):
+    """
+    Export calendar events and JIRA tasks of single user to e-conomic.
+
+    :param config: ConfigParser
+    :param src_path: path to directory with calendar credentials
+    :param dates: list of datetime
+    :param dry_run: Simulated run without creating new entries in e-conomic
+    :param refresh_cache: whether to ignore cached e-conomic data
+    :return: list of bool, one result for each entry that was tried to be added
+    """
+    # Data from e-conomic, calendar and JIRA is fetched at the same time. Calendar events
+    # and JIRA tasks flow through pipeline, so fetching next page overlaps with submitting
+    # entries, which starts as soon as e-conomic login is done.
+    with metrics.phase('export'):
+        economic_job = start_job('e-conomic login', login_economic, config, dates[0], refresh_cache)
+        submit_workers = int(dict(config.items('Economic')).get('submit_workers') or 1)
+
+        pipeline = Pipeline()
+        pipeline.add_source('calendar fetch', get_calendar_events(config, src_path, dates))
+        pipeline.add_source('JIRA fetch', get_jira_tasks(config))
+        pipeline.add_stage('convert', lambda item: convert_to_entry(economic_job.get(), item))
+        pipeline.add_stage('dedupe', lambda entry: (entry, economic_job.get().reserve_time_entry(entry)))
+        pipeline.add_stage('submit', lambda item: submit_entry(economic_job.get(), item, dry_run), submit_workers)
+        results = list(pipeline.run())
+        # Login errors have to be raised even when there was nothing to submit.
+        economic_job.get()
+
+    print("%d of %d time entries added%s" % (results.count(True), len(results), ' (dry run)' if dry_run else ''))
+    return results
+
 
-    # Get entries from provided calendar.
-    calendar = get_calendar_provider(config, src_path)
-    add_calendar_entries(calendar, dry_run, economic, date)
+def login_economic(config, date, refresh_cache=False):
+    """
+    Login to e-conomic and fetch tasks already registered for given day.
+
+    :param config: ConfigParser
+    :param date: datetime
+    :param refresh_cache: whether to ignore cached e-conomic data
+    :return: Economic
+    """
+    with metrics.phase('e-conomic login'):
+        economic = Economic(config.items('Economic'), date)
+    if refresh_cache:
+        economic.invalidate_activities()
+
+    return economic
+
+
+def submit_entry(economic, item, dry_run):
+    """
+    Post time entry unless it was found to be already registered.
+
+    :param economic: Economic
+    :param item: tuple with time entry and bool whether it should be posted
+    :param dry_run: Simulated run without creating new entries in e-conomic
+    :return: bool whether entry was added
+    """
+    entry, reserved = item
+    if not reserved:
+        return False
 
-    # Add entries from JIRA.
-    add_jira_entries(config, date, dry_run, economic)
+    return economic.post_time_entry(entry, dry_run)
 
 
-def add_calendar_entries(calendar, dry_run, economic, date):
+def get_calendar_events(config, src_path, dates):
     """
-    Add Calendar meetings as time entries to E-conomic
+    Generator returning events for all given days from calendar provider set in config file.
+
+    Duration of "calendar fetch" phase includes time of waiting for events to be processed.
 
-    :param calendar:
-    :param dry_run:
-    :param economic:
-    :param date:
-    :return:
+    :param config: ConfigParser
+    :param src_path: path to directory with calendar credentials
+    :param dates: list of datetime
     """
-    today = date.isoformat()[:10] + "T00:00:00Z"
-    tomorrow = (date + datetime.timedelta(days=1)).isoformat()[:10] + "T00:00:00Z"
-    for event in calendar.get_events(today, tomorrow):
-        try:
-            entry = economic.convert_calendar_event_to_entry(event)
-            if entry:
-                economic.add_time_entry(entry, dry_run)
-        except UnicodeDecodeError as e:
-            print(e)
+    with metrics.phase('calendar fetch'):
+        calendar = get_calendar_provider(config, src_path)
+        start = dates[0].isoformat()[:10] + "T00:00:00Z"
+        end = (dates[-1] + datetime.timedelta(days=1)).isoformat()[:10] + "T00:00:00Z"
+        for event in calendar.get_events(start, end):
+            yield 'calendar', event
 
 
-def add_jira_entries(config, date, dry_run, economic):
+def get_jira_tasks(config):
     """
-    Add JIRA tasks as time entries to E-conomic
+    Generator returning JIRA tasks matching filter set in config file.
+
+    JIRA tasks are always registered for current day. Duration of "JIRA fetch"
+    phase includes time of waiting for tasks to be processed.
 
-    :param config:
-    :param date:
-    :param dry_run:
-    :param economic:
-    :return:
+    :param config: ConfigParser
     """
-    if date is not None:
+    with metrics.phase('JIRA fetch'):
         jira = Jira(config.items('Jira'))
         for task in jira.get_tasks():
             if task:
-                economic.add_time_entry(task, dry_run)
+                yield 'jira', task
 
 
-def get_configuration(src_path):
+def get_dates(date=None, since=None, until=None):
+    """
+    Return list of days to be exported based on command line options.
+
+    Single day (given date or today) is returned unless date range is used.
+
+    :param date: date in format YYYY-MM-DD
+    :param since: first day of date range in format YYYY-MM-DD
+    :param until: last day of date range in format YYYY-MM-DD
+    :raise ValueError: raised in case of incorrect date format
+    :return: list of datetime
+    """
+    if date:
+        return [datetime.datetime.strptime(str(date), "%Y-%m-%d")]
+    if not since and not until:
+        return [datetime.datetime.now()]
+
+    today = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = datetime.datetime.strptime(str(since), "%Y-%m-%d") if since else today
+    last_day = datetime.datetime.strptime(str(until), "%Y-%m-%d") if until else today
+
+    return [first_day + datetime.timedelta(days=day) for day in range((last_day - first_day).days + 1)]
+
+
+def convert_to_entry(economic, item):
+    """
+    Convert calendar event or JIRA task to time entry.
+
+    :param economic: Economic
+    :param item: tuple with name of source and calendar event or JIRA task
+    :return: dict|None
+    """
+    source, data = item
+    if source == 'jira':
+        return data
+
+    try:
+        return economic.convert_calendar_event_to_entry(data)
+    except UnicodeDecodeError as e:
+        print(e)
+        return None
+
+
+def get_configuration(src_path, config_file=None):
     """
     Return configuration as list of tuples read from config file.
 
     :param src_path: path to current directory
+    :param config_file: path to config file, config.ini from current directory is used by default
     :return: list of tuples
     """
-    config_file = os.path.join(src_path, 'config.ini')
-    config_check = ConfigCheck(config_file + '.dist', config_file)
+    if config_file is None:
+        config_file = os.path.join(src_path, 'config.ini')
+    config_check = ConfigCheck(os.path.join(src_path, 'config.ini.dist'), config_file)
     if not config_check.check_sections(['Google', 'Economic', 'Jira', 'Office365']):
         sys.exit(1)
     config = ConfigParser.ConfigParser()
@@ -112,16 +258,28 @@ def get_calendar_provider(config, src_path):
     :param src_path: path to current directory
     :return: Calendar|OutlookCalendar
     """
-    economic_config = dict(config.items('Economic'))
-    if 'Google' == economic_config['calendar_provider']:
-        calendar = CalendarGoogle(config.items('Google'), src_path)
-    elif 'Office365' == economic_config['calendar_provider']:
-        calendar = CalendarOutlook(config.items('Office365'))
-    else:
+    provider = dict(config.items('Economic'))['calendar_provider']
+    if provider not in CALENDAR_PROVIDERS:
         print("Unsupported calendar provider")
         sys.exit(1)
 
-    return calendar
+    calendar_class = get_calendar_class(provider)
+    if 'Google' == provider:
+        return calendar_class(config.items('Google'), src_path)
+
+    return calendar_class(config.items(provider))
+
+
+def get_calendar_class(provider):
+    """
+    Import and return calendar class of given provider.
+
+    :param provider: name of provider, key of CALENDAR_PROVIDERS
+    :return: type
+    """
+    module_name, class_name = CALENDAR_PROVIDERS[provider].rsplit('.', 1)
+
+    return getattr(importlib.import_module(module_name), class_name)
 
 
 if __name__ == '__main__':
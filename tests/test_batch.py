@@ -0,0 +1,43 @@
+import os
+from click.testing import CliRunner
+from batch import batch, export_user
+from test_run import ROOT, ExportTestCase
+
+
+class TestBatch(ExportTestCase):
+    def write_user(self, name, password='secret'):
+        user_dir = os.path.join(self.directory, 'users', name)
+        os.makedirs(user_dir)
+        with open(os.path.join(user_dir, 'config.ini'), 'w') as config_file:
+            self.get_config(password).write(config_file)
+
+        return user_dir
+
+    def test_export_user(self):
+        result = export_user(ROOT, self.write_user('alice'), self.dates, False)
+        self.assertEqual({'user': 'alice', 'added': 7, 'not_added': 0, 'error': None},
+                         dict((key, value) for key, value in result.items() if key != 'time'))
+
+    def test_batch(self):
+        self.write_user('alice')
+        self.write_user('bob', password='wrong')
+        result = CliRunner().invoke(batch, [os.path.join(self.directory, 'users'), '--date', '1970-01-01'])
+        self.assertEqual(1, result.exit_code)
+        lines = result.output.splitlines()
+        self.assertTrue([line for line in lines if line.startswith('alice') and ' OK ' in line])
+        self.assertTrue([line for line in lines if line.startswith('bob') and 'ERROR' in line and 'login' in line])
+
+    def test_output_of_each_user_is_printed_as_block(self):
+        for name in ('alice', 'bob'):
+            self.write_user(name)
+        result = CliRunner().invoke(batch, [os.path.join(self.directory, 'users'), '--date', '1970-01-01'])
+        self.assertEqual(0, result.exit_code, result.output)
+        blocks = result.output.split('\n== ')
+        self.assertNotIn('time entr', blocks[0])
+        blocks = dict(block.split(' ==\n', 1) for block in blocks[1:])
+        self.assertEqual(['alice', 'bob'], sorted(blocks))
+        for block in blocks.values():
+            # Lines printed by stage threads are in block of user they were started for. Users share
+            # e-conomic server, so some entries might be found registered by the other one.
+            self.assertEqual(7, block.count('OK - time entry added') + block.count('SKIPPED'), block)
+            self.assertIn('%d of 7 time entries added' % block.count('OK - time entry added'), block)
@@ -1,6 +1,15 @@
 import copy
-from economicpy.calendar_google import CalendarGoogle
+import os
+import shutil
+import tempfile
+import httplib2
+from apiclient.errors import HttpError
+from economicpy.calendar_google import CalendarGoogle, CompressedHttp
 from unittest import TestCase
+try:
+    from mock import Mock, patch
+except ImportError:
+    from unittest.mock import Mock, patch
 
 config = [
     ('ignore_events', 'ignored,words,list'),
@@ -158,3 +167,126 @@ class TestCalendar(TestCase):
     def test_get_activity_id_returns_exctracted_activity_id(self):
         cal = CalendarGoogle(config, '')
         self.assertEquals(cal.get_activity_id('#activitY: 234'), 234)
+
+    def test_filter_events_records_skip_reasons(self):
+        date = {'dateTime': '1970-01-01T10:00:00Z'}
+        accepted = [{'responseStatus': 'accepted', 'self': True}]
+        events = [
+            {'summary': 'No attendees', 'start': date, 'end': date},
+            {'summary': 'Not accepted', 'start': date, 'end': date,
+             'attendees': [{'responseStatus': 'declined', 'self': True}]},
+            {'summary': 'Ignored event', 'start': date, 'end': date, 'attendees': accepted},
+            {'summary': 'Whole day', 'start': {'date': '1970-01-01'}, 'end': {'date': '1970-01-02'},
+             'attendees': accepted},
+            {'summary': 'Valid summary', 'start': date, 'end': date, 'attendees': accepted},
+        ]
+        cal = CalendarGoogle(config, '')
+        output = cal.filter_events(iter(events))
+        self.assertEqual([events[-1]], list(output))
+        self.assertEqual({'no attendees': 1, 'not attending': 1, 'contains ignored phrase': 1, 'dates issue': 1},
+                         cal.skipped)
+
+    def test_filter_events_with_registered_filter(self):
+        date = {'dateTime': '1970-01-01T10:00:00Z'}
+        accepted = [{'responseStatus': 'accepted', 'self': True}]
+        events = [
+            {'summary': 'Short', 'start': date, 'end': date, 'attendees': accepted},
+            {'summary': 'Valid summary', 'start': date, 'end': date, 'attendees': accepted},
+        ]
+        cal = CalendarGoogle(config, '')
+        cal.add_filter('too short summary', lambda event: len(event['summary']) > 5)
+        self.assertEqual([events[-1]], list(cal.filter_events(events)))
+        self.assertEqual({'too short summary': 1}, cal.skipped)
+
+    def test_ignore_event_with_special_characters(self):
+        config_copy = copy.copy(config)
+        config_copy.append(('ignore_events', 'OOO (holiday),[team] standup,,*'))
+        cal = CalendarGoogle(config_copy, '')
+        self.assertTrue(cal.ignore_event({'summary': 'John - ooo (Holiday)'}))
+        self.assertTrue(cal.ignore_event({'summary': '[Team] Standup'}))
+        self.assertTrue(cal.ignore_event({'summary': 'Review *'}))
+        self.assertFalse(cal.ignore_event({'summary': 'team standup'}))
+
+    def test_ignore_event_without_ignored_phrases(self):
+        config_copy = copy.copy(config)
+        config_copy.append(('ignore_events', ''))
+        cal = CalendarGoogle(config_copy, '')
+        self.assertFalse(cal.ignore_event({'summary': 'any summary'}))
+
+    def test_get_ids_returns_extracted_ids(self):
+        cal = CalendarGoogle(config, '')
+        self.assertEquals(cal.get_ids('#eConomic: 123 #activitY: 234'), (123, 234))
+
+    def test_get_events_requests_only_used_fields(self):
+        config_copy = copy.copy(config)
+        config_copy.append(('page_size', '100'))
+        cal = CalendarGoogle(config_copy, '')
+        cal.service = Mock()
+        cal.service.events.return_value.list.return_value.execute.return_value = {'items': []}
+        self.assertEqual(list(cal.get_events('1970-01-01T00:00:00Z', '1970-01-02T00:00:00Z')), [])
+        kwargs = cal.service.events.return_value.list.call_args[1]
+        self.assertEqual(kwargs['maxResults'], 100)
+        self.assertIn('nextPageToken', kwargs['fields'])
+        self.assertIn('attendees(self,responseStatus)', kwargs['fields'])
+
+
+class TestCompressedHttp(TestCase):
+    @patch('httplib2.Http.request')
+    def test_request_asks_for_gzip(self, request):
+        request.return_value = (httplib2.Response({'status': '200'}), b'{"items": []}')
+        http = CompressedHttp()
+        http.request('https://www.googleapis.com/', headers={'User-Agent': 'economic-py'})
+        headers = request.call_args[0][3]
+        self.assertEqual(headers['user-agent'], 'economic-py (gzip)')
+        self.assertEqual(headers['accept-encoding'], 'gzip')
+        self.assertEqual(http.responses, 1)
+        self.assertEqual(http.received_bytes, 13)
+
+
+class TestCalendarGoogleIncrementalSync(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        config_copy = copy.copy(config)
+        config_copy.append(('incremental_sync', 'yes'))
+        config_copy.append(('cache_dir', os.path.join(self.directory, 'cache')))
+        self.cal = CalendarGoogle(config_copy, self.directory)
+        self.cal.service = Mock()
+        self.list = self.cal.service.events.return_value.list
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def make_event(event_id, summary, status='confirmed'):
+        date = {'dateTime': '1970-01-01T%d:00:00Z' % {'a': 10, 'b': 11, 'c': 12}[event_id]}
+        return {'id': event_id, 'status': status, 'summary': summary, 'start': date, 'end': date,
+                'attendees': [{'responseStatus': 'accepted', 'self': True}]}
+
+    def get_titles(self):
+        return [event['title'] for event in self.cal.get_events('1970-01-01T00:00:00Z', '1970-01-02T00:00:00Z')]
+
+    def test_next_run_fetches_only_changes(self):
+        self.list.return_value.execute.side_effect = [
+            {'items': [self.make_event('a', 'First'), self.make_event('b', 'Second')], 'nextSyncToken': 'token1'},
+            {'items': [self.make_event('a', 'First', 'cancelled'), self.make_event('c', 'Third')],
+             'nextSyncToken': 'token2'},
+        ]
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+        self.assertEqual(self.list.call_args[1]['timeMin'], '1970-01-01T00:00:00Z')
+        self.assertNotIn('syncToken', self.list.call_args[1])
+
+        self.assertEqual(self.get_titles(), ['Second', 'Third'])
+        self.assertEqual(self.list.call_args[1]['syncToken'], 'token1')
+        self.assertNotIn('timeMin', self.list.call_args[1])
+        self.assertEqual(self.cal.event_store.sync_token, 'token2')
+
+    def test_expired_sync_token_causes_full_sync(self):
+        self.list.return_value.execute.side_effect = [
+            {'items': [self.make_event('a', 'First')], 'nextSyncToken': 'token1'},
+            HttpError(httplib2.Response({'status': 410}), b'Gone'),
+            {'items': [self.make_event('b', 'Second')], 'nextSyncToken': 'token2'},
+        ]
+        self.assertEqual(self.get_titles(), ['First'])
+        self.assertEqual(self.get_titles(), ['Second'])
+        self.assertEqual(self.list.call_args[1]['timeMin'], '1970-01-01T00:00:00Z')
+        self.assertEqual(self.cal.event_store.sync_token, 'token2')
@@ -1,4 +1,6 @@
 import copy
+import shutil
+import tempfile
 import requests
 import responses
 import json
@@ -198,3 +200,82 @@ class TestOutlookCalendar(TestCase):
         # We expect just one event to be yielded and iteration to stop after that.
         with self.assertRaises(StopIteration):
             events.next()
+
+    @responses.activate
+    def test_get_events_selects_used_fields_and_page_size(self):
+        responses.add(responses.GET, 'https://outlook.office365.com/api/v1.0/me/calendarview',
+                      body=json.dumps({'value': []}), status=200, content_type='application/json')
+        config_copy = copy.copy(config)
+        config_copy.append(('page_size', '25'))
+        cal = CalendarOutlook(config_copy)
+        self.assertEqual(list(cal.get_events('1970-01-01T00:00:00Z', '1970-01-02T00:00:00Z')), [])
+        request = responses.calls[0].request
+        self.assertIn('$select=Id,Subject,Body,Start,End,ResponseStatus,Attendees', request.url)
+        self.assertEqual(request.headers['Prefer'], 'odata.maxpagesize=25')
+
+
+class TestOutlookCalendarIncrementalSync(TestCase):
+    url = 'https://outlook.office365.com/api/v1.0/me/calendarview'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        config_copy = copy.copy(config)
+        config_copy.append(('incremental_sync', 'yes'))
+        config_copy.append(('cache_dir', self.directory))
+        self.config = config_copy
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def make_event(event_id, subject, hour):
+        return {'Id': event_id, 'Subject': subject, 'Body': {'Content': ''},
+                'Start': '1970-01-01T%d:00:00Z' % hour, 'End': '1970-01-01T%d:30:00Z' % hour,
+                'ResponseStatus': {'Response': 'Accepted'}, 'Attendees': []}
+
+    def add_response(self, body, status=200):
+        responses.add(responses.GET, self.url, body=json.dumps(body), status=status, content_type='application/json')
+
+    def get_titles(self):
+        cal = CalendarOutlook(self.config)
+        return [event['title'] for event in cal.get_events('1970-01-01T00:00:00Z', '1970-01-02T00:00:00Z')]
+
+    @responses.activate
+    def test_next_run_fetches_only_changes(self):
+        self.add_response({'value': [self.make_event('a', 'First', 10), self.make_event('b', 'Second', 11)],
+                           '@odata.deltaLink': self.url + '?$deltatoken=token1'})
+        self.add_response({'value': [{'Id': 'a', 'Reason': 'deleted'}, self.make_event('c', 'Third', 12)],
+                           '@odata.deltaLink': self.url + '?$deltatoken=token2'})
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+        self.assertIn('odata.track-changes', responses.calls[0].request.headers['Prefer'])
+        self.assertEqual(self.get_titles(), ['Second', 'Third'])
+        self.assertTrue(responses.calls[1].request.url.endswith('$deltatoken=token1'))
+
+    @responses.activate
+    def test_expired_delta_link_causes_full_sync(self):
+        self.add_response({'value': [self.make_event('a', 'First', 10)],
+                           '@odata.deltaLink': self.url + '?$deltatoken=token1'})
+        self.add_response({'error': {'code': 'SyncStateNotFound'}}, 410)
+        self.add_response({'value': [self.make_event('b', 'Second', 11)],
+                           '@odata.deltaLink': self.url + '?$deltatoken=token2'})
+        self.assertEqual(self.get_titles(), ['First'])
+        self.assertEqual(self.get_titles(), ['Second'])
+        self.assertIn('startDateTime=1970-01-01T00:00:00Z', responses.calls[2].request.url)
+
+    @responses.activate
+    def test_unchanged_page_is_read_from_cache(self):
+        event = self.make_event('a', 'Cached event', 10)
+        responses.add(responses.GET, 'https://outlook.office365.com/api/v1.0/me/calendarview',
+                      body=json.dumps({'value': [event]}), status=200, content_type='application/json',
+                      adding_headers={'ETag': 'W/"1"'})
+        responses.add(responses.GET, 'https://outlook.office365.com/api/v1.0/me/calendarview',
+                      body='', status=304)
+        config_copy = copy.copy(config)
+        config_copy.append(('page_cache', 'yes'))
+        config_copy.append(('cache_dir', self.directory))
+        for _ in range(2):
+            cal = CalendarOutlook(config_copy)
+            events = list(cal.get_events('1970-01-01T00:00:00Z', '1970-01-02T00:00:00Z'))
+            self.assertEqual([event['title'] for event in events], ['Cached event'])
+        self.assertNotIn('If-None-Match', responses.calls[0].request.headers)
+        self.assertEqual(responses.calls[1].request.headers['If-None-Match'], 'W/"1"')
@@ -1,4 +1,7 @@
+import os
+import shutil
 import sys
+import tempfile
 from unittest import TestCase
 from economicpy.config_check import ConfigCheck
 from contextlib import contextmanager
@@ -10,6 +13,13 @@ try:
     from StringIO import StringIO
 except ImportError:
     from io import StringIO
+try:
+    import ConfigParser as configparser
+except ImportError:
+    import configparser
+
+DIST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini.dist')
+SECTIONS = ['Google', 'Economic', 'Jira', 'Office365']
 
 
 @contextmanager
@@ -61,3 +71,37 @@ class TestConfigCheck(TestCase):
             config.find_differences(dist_items=dist_items, ini_items=ini_items)
         output = out.getvalue().strip()
         self.assertEqual(output, 'Not needed settings: key2')
+
+    def write_config(self, remove):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        config = configparser.ConfigParser()
+        config.read(DIST)
+        for section, option in remove:
+            config.remove_option(section, option)
+        path = os.path.join(directory, 'config.ini')
+        with open(path, 'w') as config_file:
+            config.write(config_file)
+
+        return path
+
+    def test_optional_settings_are_in_dist(self):
+        config = configparser.ConfigParser()
+        config.read(DIST)
+        for section, options in ConfigCheck.optional_settings.items():
+            for option in options:
+                self.assertTrue(config.has_option(section, option), '%s.%s' % (section, option))
+
+    def test_config_without_optional_settings_is_valid(self):
+        remove = [(section, option) for section, options in ConfigCheck.optional_settings.items()
+                  for option in options]
+        config_check = ConfigCheck(DIST, self.write_config(remove))
+        with captured_output() as (out, err):
+            self.assertTrue(config_check.check_sections(SECTIONS))
+        self.assertEqual('', out.getvalue())
+
+    def test_config_without_required_setting_is_invalid(self):
+        config_check = ConfigCheck(DIST, self.write_config([('Economic', 'agreement'), ('Office365', 'page_size')]))
+        with captured_output() as (out, err):
+            self.assertFalse(config_check.check_sections(SECTIONS))
+        self.assertIn('Missing settings: agreement', out.getvalue())
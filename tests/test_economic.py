@@ -1,6 +1,15 @@
 import responses
 import copy
+import os
+import shutil
+import tempfile
+import threading
+import time
 from unittest import TestCase
+try:
+    from mock import Mock
+except ImportError:
+    from unittest.mock import Mock
 from economicpy.economic import Economic
 from datetime import datetime
 
@@ -11,6 +20,9 @@ config = [('agreement', '123456'),
           ('description_format', '\n10={DEFAULT} - {CUSTOM}'),
           ('user_id', '12')]
 date = datetime.now()
+tasks_html = '<table><tr><th>Date</th><th>Project</th><th>Activity</th><th>Description</th><th>Hours</th></tr>' \
+             '<tr><td>%s</td><td>100 Project</td><td>10 Meeting</td><td>duplicated entry</td><td>1,0</td></tr>' \
+             '</table>'
 
 
 class TestEconomic(TestCase):
@@ -44,7 +56,7 @@ class TestEconomic(TestCase):
                       body='html task list', status=200)
         economic = Economic(config, date)
         self.assertEqual('12', economic.medarbid)
-        self.assertEqual('html task list', economic.tasks_html)
+        self.assertEqual(0, len(economic.entries))
 
     @responses.activate
     def test_login_ok_medarbid_from_web(self):
@@ -60,7 +72,7 @@ class TestEconomic(TestCase):
                       body='html task list', status=200)
         economic = Economic(config_copy, date)
         self.assertEqual('14', economic.medarbid)
-        self.assertEqual('html task list', economic.tasks_html)
+        self.assertEqual(0, len(economic.entries))
 
     @responses.activate
     def test_get_description(self):
@@ -178,6 +190,22 @@ class TestEconomic(TestCase):
         }
         self.assertFalse(economic.add_time_entry(entry))
 
+    @responses.activate
+    def test_add_time_entry_task_in_entries_table_skipped(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/subnav.asp',
+                      body='medarbid=10', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body=tasks_html % date.isoformat()[:10], status=200)
+        economic = Economic(config, date)
+        entry = {
+            'task_description': 'Duplicated  entry',
+            'date': date.isoformat()[:10]
+        }
+        self.assertFalse(economic.add_time_entry(entry))
+
     @responses.activate
     def test_add_time_entry_task_dry_run_does_nothing(self):
         responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
@@ -240,3 +268,225 @@ class TestEconomic(TestCase):
 
         }
         self.assertFalse(economic.add_time_entry(entry))
+
+    @responses.activate
+    def test_add_time_entry_task_with_same_prefix_is_not_skipped(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body=tasks_html % date.isoformat()[:10], status=200)
+        economic = Economic(config, date)
+        entry = {
+            'task_description': 'duplicated entry, but different one',
+            'date': date.isoformat()[:10],
+            'project_id': '10',
+            'activity_id': '10',
+            'time_spent': '0,0'
+        }
+        self.assertTrue(economic.add_time_entry(entry, dry_run=True))
+        self.assertFalse(economic.add_time_entry(entry, dry_run=True))
+
+    @responses.activate
+    def test_activities_are_cached_on_disk(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        config_copy = config + [('cache_dir', cache_dir), ('activity_cache_ttl', '3600')]
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/secure/applet/fbsearch/fbsearch.asp',
+                      body='{"collection": [{"0": 10, "1": "Project Name"}]}',
+                      status=200)
+        Economic(config_copy, date).init_activities()
+        economic = Economic(config_copy, date)
+        economic.init_activities()
+        fbsearch_calls = [call for call in responses.calls if 'fbsearch' in call.request.url]
+        self.assertEqual(1, len(fbsearch_calls))
+        self.assertEqual('Project Name - Task Title', economic.get_description('Task Title', 10))
+
+        economic.invalidate_activities()
+        economic.init_activities()
+        fbsearch_calls = [call for call in responses.calls if 'fbsearch' in call.request.url]
+        self.assertEqual(2, len(fbsearch_calls))
+
+    @responses.activate
+    def test_unknown_activity_refreshes_cached_activities(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        config_copy = config + [('cache_dir', cache_dir), ('activity_cache_ttl', '3600')]
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/secure/applet/fbsearch/fbsearch.asp',
+                      body='{"collection": [{"0": 1, "1": "project 1"}]}',
+                      status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/secure/applet/fbsearch/fbsearch.asp',
+                      body='{"collection": [{"0": 1, "1": "project 1"},{"0": 20, "1": "Project Name"}]}',
+                      status=200)
+        Economic(config_copy, date).init_activities()
+        economic = Economic(config_copy, date)
+        economic.init_activities()
+        self.assertEqual('Project Name', economic.get_description('Task Title', 20))
+
+    @responses.activate
+    def test_activities_are_fetched_once_per_project(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/secure/applet/fbsearch/fbsearch.asp',
+                      body='{"collection": [{"0": 10, "1": "Project 200 activity"}]}',
+                      status=200)
+        economic = Economic(config, date)
+        for title in ('First', 'Second', 'Third'):
+            event = {
+                'start_date': date.isoformat(),
+                'end_date': date.isoformat(),
+                'project_id': 200,
+                'title': title,
+                'activity_id': 10
+            }
+            entry = economic.convert_calendar_event_to_entry(event)
+            self.assertEqual('Project 200 activity - %s' % title, entry['task_description'])
+        fbsearch_calls = [call.request.url for call in responses.calls if 'fbsearch' in call.request.url]
+        self.assertEqual(1, len(fbsearch_calls))
+        self.assertIn('id=200', fbsearch_calls[0])
+
+    @responses.activate
+    def test_session_is_reused_by_next_run(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        config_copy = config[:-1] + [('user_id', ''), ('cache_dir', cache_dir), ('reuse_session', 'yes')]
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200, content_type='text/html',
+                      adding_headers={'Set-Cookie': 'ASPSESSIONID=abc; Domain=secure.e-conomic.com; Path=/'})
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/subnav.asp',
+                      body='medarbid=14', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        Economic(config_copy, date)
+        self.assertEqual(3, len(responses.calls))
+        session_file = os.path.join(cache_dir, 'session-123456-USR.json')
+        self.assertEqual(0o600, os.stat(session_file).st_mode & 0o777)
+
+        economic = Economic(config_copy, date)
+        self.assertEqual('14', economic.medarbid)
+        self.assertEqual(4, len(responses.calls))
+        self.assertIn('ASPSESSIONID=abc', responses.calls[-1].request.headers['Cookie'])
+
+    @responses.activate
+    def test_expired_session_logs_in_again(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        config_copy = config + [('cache_dir', cache_dir), ('reuse_session', 'yes')]
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='<form><input name="aftalenr"></form>', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body=tasks_html % date.isoformat()[:10], status=200)
+        Economic(config_copy, date)
+        economic = Economic(config_copy, date)
+        login_calls = [call for call in responses.calls if 'login.asp' in call.request.url]
+        self.assertEqual(2, len(login_calls))
+        self.assertTrue(economic.entries.contains(date.isoformat()[:10], 'duplicated entry'))
+
+    @responses.activate
+    def test_expired_session_is_renewed_once_by_concurrent_requests(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        economic = Economic(config, date)
+        logins = []
+
+        def authenticate():
+            time.sleep(0.1)
+            logins.append(True)
+
+        def request(method, url, data=None):
+            if logins:
+                return Mock(url=url, content=b'ok')
+            # All threads get login page before session is renewed.
+            time.sleep(0.05)
+            return Mock(url='https://secure.e-conomic.com/secure/internal/login.asp', content=b'')
+
+        economic.authenticate = authenticate
+        economic.session = Mock(request=request)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(economic.request('GET', 'https://example.com/')))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, len(logins))
+        self.assertEqual([b'ok'] * 4, [response.content for response in results])
+
+    @responses.activate
+    def test_add_time_entries_returns_results_in_input_order(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body=tasks_html % date.isoformat()[:10], status=200)
+
+        def doform_callback(request):
+            if 'cs6=Broken' in request.body:
+                return 200, {}, '{"errorMessage": "something went wrong"}'
+            return 200, {}, 'entry added'
+
+        responses.add_callback(responses.POST, 'https://secure.e-conomic.com/secure/applet/df_doform.asp',
+                               callback=doform_callback)
+        economic = Economic(config, date)
+        entries = []
+        for description in ('First', 'duplicated entry', 'Broken', 'Second', 'First'):
+            entries.append({
+                'task_description': description,
+                'date': date.isoformat()[:10],
+                'project_id': '10',
+                'activity_id': '10',
+                'time_spent': '0,0'
+            })
+        results = economic.add_time_entries(entries, max_workers=4)
+        self.assertEqual([True, False, False, True, False], results)
+        doform_calls = [call for call in responses.calls if 'df_doform' in call.request.url]
+        self.assertEqual(3, len(doform_calls))
+        self.assertFalse(economic.entries.contains(date.isoformat()[:10], 'Broken'))
+
+    @responses.activate
+    def test_add_time_entries_with_no_entries(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        economic = Economic(config, date)
+        self.assertEqual([], economic.add_time_entries(iter([])))
+
+    @responses.activate
+    def test_tasks_of_entry_day_are_fetched_once(self):
+        responses.add(responses.POST, 'https://secure.e-conomic.com/secure/internal/login.asp',
+                      body='ok', status=200,
+                      content_type='text/html')
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body='html task list', status=200)
+        responses.add(responses.GET, 'https://secure.e-conomic.com/Secure/generelt/dataedit.asp',
+                      body=tasks_html % '2-1-2016', status=200)
+        economic = Economic(config, datetime(2016, 1, 1))
+        entry = {'task_description': 'duplicated entry', 'date': '2016-01-02'}
+        self.assertFalse(economic.reserve_time_entry(entry))
+        self.assertFalse(economic.reserve_time_entry(entry))
+        dataedit_calls = [call.request.url for call in responses.calls if 'dataedit' in call.request.url]
+        self.assertEqual(2, len(dataedit_calls))
+        self.assertIn('dato=2-1-2016', dataedit_calls[-1])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+from economicpy.entry_store import EntryStore
+
+html = u'''
+<table>
+    <tr><th>Date</th><th>Project</th><th>Activity</th><th>Description</th><th>Hours</th></tr>
+    <tr>
+        <td>1-1-2016</td><td>100 Project</td><td>10 Meeting</td>
+        <td><a href="#">TEST-1   Task &amp; summary</a></td><td>1,5</td>
+    </tr>
+    <tr><td>1-1-2016</td><td>100 Project</td><td>10 Meeting</td><td>Spotkanie zespołu</td><td>0,5</td></tr>
+    <tr><td colspan="5">Total</td></tr>
+</table>
+'''
+
+
+class TestEntryStore(TestCase):
+    def test_load_parses_entries(self):
+        store = EntryStore()
+        store.load('2016-01-01', html)
+        self.assertEqual(2, len(store))
+        entry = store.entries[('2016-01-01', u'test-1 task & summary')]
+        self.assertEqual(u'100 Project', entry.project)
+        self.assertEqual(u'10 Meeting', entry.activity)
+        self.assertEqual(u'1,5', entry.hours)
+
+    def test_contains_ignores_case_and_whitespaces(self):
+        store = EntryStore()
+        store.load('2016-01-01', html)
+        self.assertTrue(store.contains('2016-01-01', 'TEST-1 Task & Summary'))
+        self.assertTrue(store.contains('2016-01-01', u'spotkanie zespołu'.encode('utf8')))
+
+    def test_contains_requires_description_prefix_and_same_day(self):
+        store = EntryStore()
+        store.load('2016-01-01', html)
+        self.assertFalse(store.contains('2016-01-01', 'TEST-10 Task & summary'))
+        self.assertFalse(store.contains('2016-01-02', 'TEST-1 Task & summary'))
+
+    def test_contains_searches_page_without_entries_table(self):
+        store = EntryStore()
+        store.load('2016-01-01', u'<form><input name="cs6" value="TEST-1 Task &amp; summary, truncated"></form>'
+                                 u'<div>Spotkanie  zespołu</div>')
+        self.assertEqual(0, len(store))
+        self.assertTrue(store.contains('2016-01-01', u'test-1 task & summary'))
+        self.assertTrue(store.contains('2016-01-01', u'TEST-1 Task & summary, which was truncated'))
+        self.assertTrue(store.contains('2016-01-01', u'Spotkanie zespołu'))
+        self.assertFalse(store.contains('2016-01-01', u'TEST-2 Other task'))
+        self.assertFalse(store.contains('2016-01-02', u'Spotkanie zespołu'))
+
+    def test_columns_are_read_by_header_names(self):
+        store = EntryStore()
+        store.load('2016-01-01', u'''
+<table><tr><td>Menu</td><td>Time</td><td>Reports</td><td>Settings</td><td>Logout</td></tr></table>
+<table>
+    <tr><th></th><th>Date</th><th>Project</th><th>Activity</th><th>Description</th><th>Hours</th><th>Approved</th></tr>
+    <tr><td><input type="checkbox"></td><td>1-1-2016</td><td>100 Project</td><td>10 Meeting</td>
+        <td>Standup meeting</td><td>0,25</td><td>No</td></tr>
+</table>
+''')
+        self.assertEqual(1, len(store))
+        entry = store.entries[('2016-01-01', u'standup meeting')]
+        self.assertEqual(u'10 Meeting', entry.activity)
+        self.assertEqual(u'0,25', entry.hours)
+        self.assertTrue(store.contains('2016-01-01', 'Standup meeting'))
+
+    def test_rows_without_recognised_header_are_not_indexed(self):
+        store = EntryStore()
+        store.load('2016-01-01', u'''
+<table>
+    <tr><th>Dato</th><th>Projekt</th><th>Aktivitet</th><th>Tekst</th><th>Timer</th></tr>
+    <tr><td>1-1-2016</td><td>100 Project</td><td>10 Meeting</td><td>Standup meeting</td><td>0,25</td></tr>
+</table>
+''')
+        self.assertEqual(0, len(store))
+        self.assertTrue(store.contains('2016-01-01', 'Standup meeting'))
+
+    def test_page_with_entries_table_is_searched_too(self):
+        store = EntryStore()
+        store.load('2016-01-01', html)
+        self.assertTrue(store.contains('2016-01-01', u'10 Meeting'))
+
+    def test_add(self):
+        store = EntryStore()
+        store.add('2016-01-01', 100, 10, 'New entry', '1,0')
+        self.assertTrue(store.contains('2016-01-01', 'new entry'))
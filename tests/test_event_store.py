@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+from economicpy.event_store import EventStore
+from unittest import TestCase
+
+
+def make_event(event_id, start, status='confirmed'):
+    return {'id': event_id, 'status': status, 'start': {'dateTime': start}, 'end': {'dateTime': start}}
+
+
+class TestEventStore(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_update_saves_events_and_removes_cancelled_ones(self):
+        store = EventStore(self.directory, 'events')
+        store.reset('1970-01-01T00:00:00Z')
+        store.update([make_event('a', '1970-01-01T10:00:00Z'), make_event('b', '1970-01-01T11:00:00Z')], 'token1')
+        store.update([{'id': 'a', 'status': 'cancelled'}, make_event('c', '1970-01-01T09:00:00Z')], 'token2')
+        self.assertEqual(sorted(store.events), ['b', 'c'])
+        self.assertEqual(store.sync_token, 'token2')
+
+    def test_save_and_load(self):
+        store = EventStore(self.directory, 'events')
+        store.reset('1970-01-01T00:00:00Z')
+        store.update([make_event('a', '1970-01-01T10:00:00Z')], 'token')
+        store.save()
+
+        loaded = EventStore(self.directory, 'events')
+        loaded.load()
+        self.assertEqual(loaded.since, '1970-01-01T00:00:00Z')
+        self.assertEqual(loaded.sync_token, 'token')
+        self.assertEqual(list(loaded.events), ['a'])
+
+    def test_is_synced(self):
+        store = EventStore(self.directory, 'events')
+        store.load()
+        self.assertFalse(store.is_synced('1970-01-02T00:00:00Z'))
+        store.reset('1970-01-02T00:00:00Z')
+        store.update([], 'token')
+        self.assertTrue(store.is_synced('1970-01-02T00:00:00Z'))
+        self.assertTrue(store.is_synced('1970-01-03T00:00:00Z'))
+        self.assertFalse(store.is_synced('1970-01-01T00:00:00Z'))
+
+    def test_get_events_returns_events_in_range_ordered_by_start(self):
+        store = EventStore(self.directory, 'events')
+        store.update([
+            make_event('late', '1970-01-02T15:00:00+02:00'),
+            make_event('early', '1970-01-02T08:00:00+02:00'),
+            make_event('before', '1970-01-01T10:00:00Z'),
+            make_event('after', '1970-01-03T10:00:00Z'),
+        ], 'token')
+        events = store.get_events('1970-01-02T00:00:00Z', '1970-01-03T00:00:00Z')
+        self.assertEqual([event['id'] for event in events], ['early', 'late'])
@@ -0,0 +1,99 @@
+import datetime
+import shutil
+import tempfile
+from economicpy.calendar_google import CalendarGoogle
+from economicpy.calendar_outlook import CalendarOutlook
+from economicpy.economic import Economic
+from economicpy.fake_servers import FakeEconomicServer, FakeGoogleServer, FakeJiraServer, FakeOutlookServer
+from economicpy.jira import Jira
+from unittest import TestCase
+
+calendar_config = [
+    ('ignore_events', 'ignored'),
+    ('project_id_pattern', '#economic[^0-9]+([0-9]+)'),
+    ('activity_id_pattern', '#activity[^0-9]+([0-9]+)'),
+    ('default_activity_id', 1),
+    ('default_project_id', 100),
+]
+start_date = '1970-01-01T00:00:00Z'
+end_date = '1970-01-02T00:00:00Z'
+
+
+class TestFakeServers(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_economic(self):
+        with FakeEconomicServer(size=3) as server:
+            config = [
+                ('agreement', '1'), ('username', 'user'), ('password', 'secret'), ('user_id', ''),
+                ('description_format', '\n1 = {DEFAULT} - {CUSTOM}'), ('default_project_id', '100'),
+                ('cache_dir', self.directory), ('reuse_session', 'no'), ('base_url', server.url)
+            ]
+            economic = Economic(config, datetime.datetime(1970, 1, 1))
+            self.assertEqual(economic.medarbid, '1')
+            self.assertEqual(len(economic.entries), 3)
+            entry = economic.convert_calendar_event_to_entry({
+                'start_date': '1970-01-01T10:00:00Z', 'end_date': '1970-01-01T11:30:00Z',
+                'title': 'Meeting', 'project_id': 100, 'activity_id': 1
+            })
+            self.assertTrue(economic.add_time_entry(entry))
+            self.assertFalse(economic.add_time_entry(dict(entry)))
+            self.assertEqual(len(server.posted), 1)
+            self.assertEqual(server.posted[0]['cs6'], 'Activity 1 - Meeting')
+            self.assertEqual(server.posted[0]['cs7'], '1,5')
+
+    def test_economic_login_failed(self):
+        with FakeEconomicServer() as server:
+            config = [
+                ('agreement', '1'), ('username', 'user'), ('password', 'wrong'), ('user_id', ''),
+                ('description_format', ''), ('reuse_session', 'no'), ('base_url', server.url)
+            ]
+            self.assertRaises(Exception, Economic, config, datetime.datetime(1970, 1, 1))
+
+    def test_jira_retries_unavailable_search(self):
+        with FakeJiraServer(size=30, page_size=20, worklogs=25) as server:
+            server.add_error('/search$', 503)
+            jira = Jira([
+                ('username', 'user'), ('password', 'secret'), ('economic_field', 'customfield_10000'),
+                ('search_query', 'assignee=currentUser()'), ('api_url', server.url + '/rest/api/2/'),
+                ('default_activity_id', 1), ('inline_worklogs', 'yes'), ('worklog_workers', '4'),
+                ('retry_backoff', '0')
+            ])
+            tasks = list(jira.get_tasks())
+            self.assertEqual(len(tasks), 30)
+            self.assertEqual(tasks[0]['task_description'], 'FAKE-0 Issue 0')
+            self.assertEqual(tasks[0]['time_spent'], '12,5')
+            self.assertEqual(server.count_requests('/search$'), 3)
+            # Worklogs longer than 20 items aren't complete in search results.
+            self.assertEqual(server.count_requests('/worklog$'), 30)
+
+    def test_google_calendar(self):
+        with FakeGoogleServer(size=30, page_size=20) as server:
+            config = calendar_config + [('api_url', server.url), ('incremental_sync', 'yes'),
+                                        ('cache_dir', self.directory)]
+            events = list(CalendarGoogle(config, self.directory).get_events(start_date, end_date))
+            self.assertEqual(len(events), 30)
+            self.assertEqual(events[0]['project_id'], 100)
+            self.assertEqual(server.count_requests('/events$'), 2)
+
+            server.expire_sync_tokens()
+            events = list(CalendarGoogle(config, self.directory).get_events(start_date, end_date))
+            self.assertEqual(len(events), 30)
+            # Expired token is rejected, then full sync is made.
+            self.assertEqual(server.count_requests('/events$'), 5)
+
+    def test_outlook_calendar(self):
+        with FakeOutlookServer(size=30, page_size=20) as server:
+            config = calendar_config + [
+                ('api_url', server.url + '/api/v1.0/'), ('email', 'user@example.com'), ('password', 'secret'),
+                ('page_size', '10'), ('page_cache', 'yes'), ('cache_dir', self.directory)
+            ]
+            for _ in range(2):
+                events = list(CalendarOutlook(config).get_events(start_date, end_date))
+                self.assertEqual(len(events), 30)
+                self.assertEqual(events[-1]['title'], 'Meeting 29')
+            self.assertEqual(server.count_requests(), 6)
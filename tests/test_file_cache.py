@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from economicpy.file_cache import FileCache
+
+
+class TestFileCache(TestCase):
+    def setUp(self):
+        self.directory = os.path.join(tempfile.mkdtemp(), 'cache')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.directory))
+
+    def test_get_missing_value(self):
+        self.assertIsNone(FileCache(self.directory).get('missing'))
+
+    def test_set_and_get(self):
+        cache = FileCache(self.directory)
+        cache.set('key/with spaces', {'1': 'activity'})
+        self.assertEqual({'1': 'activity'}, FileCache(self.directory).get('key/with spaces', 60))
+
+    def test_expired_value(self):
+        cache = FileCache(self.directory)
+        cache.set('key', 'value')
+        self.assertIsNone(cache.get('key', -1))
+        self.assertEqual('value', cache.get('key'))
+
+    def test_delete(self):
+        cache = FileCache(self.directory)
+        cache.set('key', 'value')
+        cache.delete('key')
+        cache.delete('key')
+        self.assertIsNone(cache.get('key'))
+
+    def test_prune(self):
+        cache = FileCache(self.directory)
+        cache.set('page-old', 'value')
+        cache.set('page-new', 'value')
+        cache.set('other', 'value')
+        old = os.path.getmtime(cache.get_path('page-old')) - 120
+        os.utime(cache.get_path('page-old'), (old, old))
+        os.utime(cache.get_path('other'), (old, old))
+        cache.prune('page-', 60)
+        self.assertIsNone(cache.get('page-old'))
+        self.assertEqual('value', cache.get('page-new'))
+        self.assertEqual('value', cache.get('other'))
+        FileCache(os.path.join(self.directory, 'missing')).prune('page-', 60)
@@ -0,0 +1,24 @@
+from unittest import TestCase
+from economicpy.http_session import create_session
+
+
+class TestHttpSession(TestCase):
+    def test_default_settings(self):
+        adapter = create_session({}).get_adapter('https://jira.example.com/')
+        self.assertEqual(10, adapter._pool_maxsize)
+        self.assertEqual(3, adapter.max_retries.total)
+        self.assertEqual(0.5, adapter.max_retries.backoff_factor)
+
+    def test_settings_from_config(self):
+        config = {'pool_size': '20', 'max_retries': '5', 'retry_backoff': '2'}
+        adapter = create_session(config).get_adapter('http://jira.example.com/')
+        self.assertEqual(20, adapter._pool_maxsize)
+        self.assertEqual(5, adapter.max_retries.total)
+        self.assertEqual(2.0, adapter.max_retries.backoff_factor)
+
+    def test_retries_on_too_many_requests_honouring_retry_after(self):
+        retry = create_session({}).get_adapter('https://jira.example.com/').max_retries
+        self.assertTrue(retry.is_retry('GET', 429, has_retry_after=True))
+        self.assertTrue(retry.is_retry('GET', 503))
+        self.assertFalse(retry.is_retry('GET', 404))
+        self.assertTrue(retry.respect_retry_after_header)
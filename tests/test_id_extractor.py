@@ -0,0 +1,36 @@
+from economicpy.id_extractor import IdExtractor
+from unittest import TestCase
+
+project_pattern = '#economic[^0-9]+([0-9]+)'
+activity_pattern = '#activity[^0-9]+([0-9]+)'
+
+
+class TestIdExtractor(TestCase):
+    def test_extract_returns_both_ids(self):
+        extractor = IdExtractor(project_pattern, activity_pattern, 20, 10)
+        self.assertEqual(extractor.extract('Agenda\n#eConomic: 123\n#Activity: 234'), (123, 234))
+
+    def test_extract_returns_last_project_id_and_first_activity_id(self):
+        extractor = IdExtractor(project_pattern, activity_pattern, 20, 10)
+        text = '#activity: 1 #economic: 2 #activity: 3 #economic: 4'
+        self.assertEqual(extractor.extract(text), (4, 1))
+
+    def test_extract_returns_defaults(self):
+        extractor = IdExtractor(project_pattern, activity_pattern, 20, 10)
+        self.assertEqual(extractor.extract('description'), (20, 10))
+
+    def test_extract_returns_error_for_missing_patterns(self):
+        extractor = IdExtractor('', None, 20, 10)
+        self.assertEqual(extractor.extract('#economic: 123 #activity: 234'), (-1, -1))
+
+    def test_extract_with_single_pattern(self):
+        extractor = IdExtractor(project_pattern, '', 20, 10)
+        self.assertEqual(extractor.extract('#economic: 123 #activity: 234'), (123, -1))
+
+    def test_extract_with_project_pattern_without_groups(self):
+        extractor = IdExtractor('[0-9]{3}', activity_pattern, 20, 10)
+        self.assertEqual(extractor.extract('123 #activity: 23 456'), (456, 23))
+
+    def test_extract_with_same_group_names(self):
+        extractor = IdExtractor('#economic[^0-9]+(?P<id>[0-9]+)', '#activity[^0-9]+(?P<id>[0-9]+)', 20, 10)
+        self.assertEqual(extractor.extract('#economic: 123 #activity: 234'), (123, 234))
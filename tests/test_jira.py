@@ -195,3 +195,105 @@ class TestJira(TestCase):
         jira = Jira(config)
         tasks = jira.get_tasks()
         assert next(tasks, False) is False
+
+    @responses.activate
+    def test_get_tasks_with_parallel_worklogs_keeps_search_order(self):
+        now = datetime.datetime.now()
+        config = copy.copy(CONFIG)
+        config.append(('search_query', 'test'))
+        config.append(('economic_field', 'customfield_economic'))
+        config.append(('default_activity_id', '100'))
+        config.append(('worklog_workers', '4'))
+
+        url_re = re.compile(r'http://jira\.example\.com/search\?jql(.)+')
+        issues = ','.join('{"key": "TEST-%d","fields": {"summary": "Task %d","customfield_economic": "200"}}' % (i, i)
+                          for i in range(1, 6))
+        responses.add(responses.GET, url_re,
+                      body='{"startAt": 0,"maxResults": 50,"total": 5,"issues": [%s]}' % issues,
+                      status=200,
+                      content_type='application/json')
+        for i in range(1, 6):
+            responses.add(responses.GET, 'http://jira.example.com/issue/TEST-%d/worklog' % i,
+                          body='{"startAt":0,"maxResults":50,"total":1,"worklogs":[{"author":{"name":"sample_username"},"timeSpentSeconds":%d,"started":"%s"}]}' % (i * 1800, now),
+                          status=200,
+                          content_type='application/json')
+        jira = Jira(config)
+        tasks = list(jira.get_tasks())
+        assert ['TEST-%d Task %d' % (i, i) for i in range(1, 6)] == [task['task_description'] for task in tasks]
+        assert ['0,5', '1,0', '1,5', '2,0', '2,5'] == [task['time_spent'] for task in tasks]
+
+    @responses.activate
+    def test_get_tasks_uses_inline_worklogs(self):
+        now = datetime.datetime.now()
+        config = copy.copy(CONFIG)
+        config.append(('search_query', 'test'))
+        config.append(('economic_field', 'customfield_economic'))
+        config.append(('inline_worklogs', 'yes'))
+
+        url_re = re.compile(r'http://jira\.example\.com/search\?jql=test&fields=summary,customfield_economic,worklog')
+        responses.add(responses.GET, url_re,
+                      body='{"startAt": 0,"maxResults": 50,"total": 1,"issues": [{"key": "TEST-1","fields": {"summary": "Task summary","customfield_economic": "200","worklog": {"startAt":0,"maxResults":20,"total":1,"worklogs":[{"author":{"name":"sample_username"},"timeSpentSeconds":1800,"started":"%s"}]}}}]}' % now,
+                      status=200,
+                      content_type='application/json')
+        jira = Jira(config)
+        task = next(jira.get_tasks())
+        assert '0,5' == task['time_spent']
+        assert 1 == len(responses.calls)
+
+    @responses.activate
+    def test_get_tasks_fetches_truncated_inline_worklog(self):
+        now = datetime.datetime.now()
+        config = copy.copy(CONFIG)
+        config.append(('search_query', 'test'))
+        config.append(('economic_field', 'customfield_economic'))
+        config.append(('inline_worklogs', 'yes'))
+
+        url_re = re.compile(r'http://jira\.example\.com/search\?jql(.)+')
+        responses.add(responses.GET, url_re,
+                      body='{"startAt": 0,"maxResults": 50,"total": 1,"issues": [{"key": "TEST-1","fields": {"summary": "Task summary","customfield_economic": "200","worklog": {"startAt":0,"maxResults":1,"total":2,"worklogs":[{"author":{"name":"sample_username"},"timeSpentSeconds":1800,"started":"%s"}]}}}]}' % now,
+                      status=200,
+                      content_type='application/json')
+        responses.add(responses.GET, 'http://jira.example.com/issue/TEST-1/worklog',
+                      body='{"startAt":0,"maxResults":50,"total":2,"worklogs":[{"author":{"name":"sample_username"},"timeSpentSeconds":1800,"started":"%s"},{"author":{"name":"sample_username"},"timeSpentSeconds":1800,"started":"%s"}]}' % (now, now),
+                      status=200,
+                      content_type='application/json')
+        jira = Jira(config)
+        task = next(jira.get_tasks())
+        assert '1,0' == task['time_spent']
+        assert 2 == len(responses.calls)
+
+    @responses.activate
+    def test_get_tasks_from_many_pages(self):
+        config = copy.copy(CONFIG)
+        config.append(('search_query', 'test'))
+        config.append(('economic_field', 'customfield_economic'))
+        config.append(('search_page_size', '2'))
+
+        for start_at, keys in ((0, (1, 2)), (2, (3, 4)), (4, (5,))):
+            issues = ','.join('{"key": "TEST-%d","fields": {"summary": "Task","customfield_economic": "200"}}' % key
+                              for key in keys)
+            responses.add(responses.GET,
+                          re.compile(r'http://jira\.example\.com/search\?jql=test.*&maxResults=2&startAt=%d$' % start_at),
+                          body='{"startAt": %d,"maxResults": 2,"total": 5,"issues": [%s]}' % (start_at, issues),
+                          status=200,
+                          content_type='application/json')
+        responses.add(responses.GET, re.compile(r'http://jira\.example\.com/issue/TEST-\d/worklog'),
+                      body='{"startAt":0,"maxResults":50,"total":0,"worklogs":[]}', status=200,
+                      content_type='application/json')
+        jira = Jira(config)
+        tasks = list(jira.get_tasks())
+        assert ['TEST-%d Task' % key for key in range(1, 6)] == [task['task_description'] for task in tasks]
+
+    @responses.activate
+    def test_get_tasks_with_percent_encoded_query(self):
+        config = copy.copy(CONFIG)
+        config.append(('search_query', 'project%20%3D%20ABC'))
+        config.append(('economic_field', 'customfield_economic'))
+
+        responses.add(responses.GET, re.compile(r'http://jira\.example\.com/search\?jql=project%20%3D%20ABC&.+'),
+                      body='{"startAt": 0,"maxResults": 50,"total": 0,"issues": []}',
+                      status=200,
+                      content_type='application/json')
+        jira = Jira(config)
+        assert [] == list(jira.get_tasks())
+        assert responses.calls[0].request.url.endswith('&maxResults=50&startAt=0')
@@ -0,0 +1,36 @@
+from unittest import TestCase
+from economicpy.lru_cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+    def test_loader_called_once_per_key(self):
+        calls = []
+
+        def loader(key):
+            calls.append(key)
+            return key * 2
+
+        cache = LRUCache(2)
+        self.assertEqual(2, cache.get(1, loader))
+        self.assertEqual(2, cache.get(1, loader))
+        self.assertEqual([1], calls)
+
+    def test_missing_value_without_loader(self):
+        self.assertIsNone(LRUCache(2).get('missing'))
+
+    def test_least_recently_used_value_is_removed(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(2, len(cache))
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.clear()
+        self.assertEqual(0, len(cache))
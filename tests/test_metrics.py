@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+import responses
+from economicpy.fake_servers import FakeJiraServer
+from economicpy.http_session import create_session
+from economicpy.metrics import Metrics
+from unittest import TestCase
+
+
+class TestMetrics(TestCase):
+    def test_phase_durations_are_summed(self):
+        metrics = Metrics()
+        metrics.add_phase('login', 1.5)
+        metrics.add_phase('login', 0.5)
+        with metrics.phase('fetch'):
+            pass
+        phases = metrics.to_dict()['phases']
+        self.assertEqual(list(phases), ['login', 'fetch'])
+        self.assertEqual(phases['login'], {'seconds': 2.0, 'count': 2})
+        self.assertEqual(phases['fetch']['count'], 1)
+
+    def test_listeners_are_called_after_phase(self):
+        metrics = Metrics()
+        calls = []
+        metrics.add_listener(lambda name, seconds: calls.append(name))
+        with metrics.phase('login'):
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['login'])
+
+    def test_get_endpoint_replaces_ids(self):
+        self.assertEqual(Metrics.get_endpoint('https://jira.example.com/rest/api/2/issue/ABC-123/worklog'),
+                         '/rest/api/2/issue/{id}/worklog')
+        self.assertEqual(Metrics.get_endpoint('https://outlook.office365.com/api/v1.0/me/calendarview?$skip=10'),
+                         '/api/v1.0/me/calendarview')
+        self.assertEqual(Metrics.get_endpoint('https://www.googleapis.com/calendar/v3/calendars/me@example.com/events'),
+                         '/calendar/v3/calendars/{id}/events')
+
+    def test_add_request(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        metrics.add_request('jira', 'https://jira.example.com/search?startAt=0', 0.05, 200, 100, 10)
+        metrics.add_request('jira', 'https://jira.example.com/search?startAt=50', 0.5, 503, 20, 10, 2)
+        request = metrics.to_dict()['requests'][0]
+        self.assertEqual(request['service'], 'jira')
+        self.assertEqual(request['endpoint'], '/search')
+        self.assertEqual(request['count'], 2)
+        self.assertEqual(request['errors'], 1)
+        self.assertEqual(request['retries'], 2)
+        self.assertEqual(request['bytes_received'], 120)
+        self.assertEqual(request['bytes_sent'], 20)
+        self.assertEqual(dict(request['buckets']), {'0.1': 1, '1': 2})
+
+    @responses.activate
+    def test_instrument_session(self):
+        responses.add(responses.GET, 'https://jira.example.com/search', body='{"issues": []}', status=200)
+        metrics = Metrics()
+        session = create_session({})
+        metrics.instrument_session(session, 'jira')
+        session.get('https://jira.example.com/search')
+        request = metrics.to_dict()['requests'][0]
+        self.assertEqual((request['endpoint'], request['count'], request['bytes_received']), ('/search', 1, 14))
+
+    def test_instrumented_session_counts_retries(self):
+        metrics = Metrics()
+        session = create_session({'retry_backoff': '0'})
+        metrics.instrument_session(session, 'jira')
+        with FakeJiraServer(size=0) as server:
+            server.add_error('/search$', 503)
+            session.get(server.url + '/rest/api/2/search')
+        request = metrics.to_dict()['requests'][0]
+        self.assertEqual((request['count'], request['errors'], request['retries']), (1, 0, 1))
+
+    def test_to_prometheus(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        metrics.add_phase('login', 1.5)
+        metrics.add_request('jira', 'https://jira.example.com/search', 0.5, 200, 100)
+        lines = metrics.to_prometheus().splitlines()
+        self.assertIn('economicpy_phase_seconds{phase="login"} 1.500000', lines)
+        self.assertIn('economicpy_http_requests_total{service="jira",endpoint="/search"} 1', lines)
+        self.assertIn('economicpy_http_request_duration_seconds_bucket{service="jira",endpoint="/search",le="0.1"} 0',
+                      lines)
+        self.assertIn('economicpy_http_request_duration_seconds_bucket{service="jira",endpoint="/search",le="+Inf"} 1',
+                      lines)
+        self.assertIn('# TYPE economicpy_http_request_duration_seconds histogram', lines)
+
+    def test_write(self):
+        directory = tempfile.mkdtemp()
+        try:
+            metrics = Metrics()
+            metrics.add_phase('login', 1.5)
+            metrics.write(os.path.join(directory, 'metrics.json'))
+            metrics.write(os.path.join(directory, 'metrics.prom'), prometheus=True)
+            with open(os.path.join(directory, 'metrics.json')) as metrics_file:
+                self.assertEqual(json.load(metrics_file)['phases']['login']['seconds'], 1.5)
+            with open(os.path.join(directory, 'metrics.prom')) as metrics_file:
+                self.assertIn('phase="login"', metrics_file.read())
+            self.assertEqual(sorted(os.listdir(directory)), ['metrics.json', 'metrics.prom'])
+        finally:
+            shutil.rmtree(directory)
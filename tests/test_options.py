@@ -0,0 +1,15 @@
+import os
+from unittest import TestCase
+from economicpy.options import get_cache_dir, is_enabled
+
+
+class TestOptions(TestCase):
+    def test_is_enabled(self):
+        config = {'first': 'Yes', 'second': 'on', 'third': '1', 'fourth': 'no', 'fifth': '', 'sixth': True}
+        self.assertEqual([True, True, True, False, False, True, False],
+                         [is_enabled(config, name) for name in ('first', 'second', 'third', 'fourth', 'fifth',
+                                                                 'sixth', 'missing')])
+
+    def test_get_cache_dir(self):
+        self.assertEqual('/tmp/cache', get_cache_dir({'cache_dir': '/tmp/cache'}))
+        self.assertEqual(os.path.expanduser('~/.economic-py'), get_cache_dir({'cache_dir': ''}))
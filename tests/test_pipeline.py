@@ -0,0 +1,134 @@
+import sys
+import threading
+import time
+import traceback
+from unittest import TestCase
+from economicpy.pipeline import Pipeline
+try:
+    from thread import interrupt_main
+except ImportError:
+    from _thread import interrupt_main
+
+
+class TestPipeline(TestCase):
+    def test_items_flow_through_stages_in_order(self):
+        pipeline = Pipeline(queue_size=2)
+        pipeline.add_source('numbers', range(20))
+        pipeline.add_stage('double', lambda item: item * 2)
+        pipeline.add_stage('skip odd tens', lambda item: None if item % 20 == 10 else item)
+        self.assertEqual([item * 2 for item in range(20) if item * 2 % 20 != 10], list(pipeline.run()))
+
+    def test_many_sources_and_workers(self):
+        pipeline = Pipeline(queue_size=1)
+        pipeline.add_source('first', range(0, 50))
+        pipeline.add_source('second', range(50, 100))
+        pipeline.add_stage('identity', lambda item: item, workers=4)
+        self.assertEqual(list(range(100)), sorted(pipeline.run()))
+
+    def test_queue_size_limits_items_read_from_source(self):
+        produced = []
+
+        def source():
+            for item in range(100):
+                produced.append(item)
+                yield item
+
+        pipeline = Pipeline(queue_size=2)
+        pipeline.add_source('source', source())
+        pipeline.add_stage('identity', lambda item: item)
+        items = pipeline.run()
+        next(items)
+        time.sleep(0.3)
+        self.assertLess(len(produced), 10)
+        items.close()
+
+    def test_error_in_stage_is_raised(self):
+        pipeline = Pipeline()
+        pipeline.add_source('numbers', range(10))
+        pipeline.add_stage('failing', lambda item: 1 // (item - 5))
+        self.assertRaises(ZeroDivisionError, list, pipeline.run())
+
+    def test_error_in_source_is_raised(self):
+        def source():
+            yield 1
+            raise ValueError('source failed')
+
+        pipeline = Pipeline()
+        pipeline.add_source('source', source())
+        pipeline.add_stage('identity', lambda item: item)
+        self.assertRaises(ValueError, list, pipeline.run())
+
+    def test_items_of_other_sources_are_processed_when_source_fails(self):
+        def source():
+            yield 1
+            raise ValueError('connection lost')
+
+        processed = []
+        pipeline = Pipeline(queue_size=1)
+        pipeline.add_source('failing', source())
+        pipeline.add_source('numbers', range(10, 20))
+        pipeline.add_stage('collect', processed.append)
+        with self.assertRaises(ValueError) as context:
+            list(pipeline.run())
+        self.assertEqual([1] + list(range(10, 20)), sorted(processed))
+        self.assertEqual('failing: connection lost', str(context.exception))
+
+    def test_error_is_raised_with_name_of_stage_and_original_traceback(self):
+        def divide(item):
+            return 1 // (item - 5)
+
+        pipeline = Pipeline()
+        pipeline.add_source('numbers', range(10))
+        pipeline.add_stage('divide', divide)
+        try:
+            list(pipeline.run())
+        except ZeroDivisionError as e:
+            self.assertTrue(str(e).startswith('divide: '))
+            self.assertEqual('divide', traceback.extract_tb(sys.exc_info()[2])[-1][2])
+        else:
+            self.fail('ZeroDivisionError not raised')
+
+    def test_all_threads_finish(self):
+        threads = threading.active_count()
+        pipeline = Pipeline()
+        pipeline.add_source('numbers', range(10))
+        pipeline.add_stage('identity', lambda item: item, workers=3)
+        list(pipeline.run())
+        time.sleep(0.3)
+        self.assertEqual(threads, threading.active_count())
+
+    def test_threads_finish_after_error_when_busy_source_returns(self):
+        release = threading.Event()
+
+        def slow_source():
+            yield 1
+            # Source waits e.g. for HTTP response when pipeline fails.
+            release.wait()
+            yield 2
+
+        pipeline = Pipeline(queue_size=1, stop_timeout=0.2)
+        pipeline.add_source('numbers', range(100))
+        pipeline.add_source('slow', slow_source())
+        pipeline.add_stage('failing', lambda item: 1 // (item - 5))
+        self.assertRaises(ZeroDivisionError, list, pipeline.run())
+        release.set()
+        time.sleep(0.3)
+        names = [thread.name for thread in threading.enumerate()]
+        self.assertEqual([], [name for name in names if name in ('numbers', 'slow', 'failing-0')])
+
+    def test_waiting_for_items_can_be_interrupted(self):
+        release = threading.Event()
+
+        def waiting_source():
+            release.wait()
+            yield 1
+
+        pipeline = Pipeline(stop_timeout=0.2)
+        pipeline.wait_timeout = 0.05
+        pipeline.add_source('waiting', waiting_source())
+        pipeline.add_stage('identity', lambda item: item)
+        threading.Timer(0.1, interrupt_main).start()
+        start = time.time()
+        self.assertRaises(KeyboardInterrupt, list, pipeline.run())
+        self.assertLess(time.time() - start, 2)
+        release.set()
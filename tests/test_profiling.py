@@ -0,0 +1,41 @@
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+from economicpy.metrics import metrics
+from economicpy.profiling import Profiler
+from unittest import TestCase
+
+
+def profiled_function():
+    return sum(range(1000))
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'run.pstats')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_threads_are_profiled(self):
+        with Profiler(self.path, top=5):
+            thread = threading.Thread(target=profiled_function)
+            thread.start()
+            thread.join()
+        functions = [function for _, _, function in pstats.Stats(self.path).stats]
+        self.assertIn('profiled_function', functions)
+
+    def test_memory_is_traced_at_phase_boundaries(self):
+        profiler = Profiler(self.path, top=5, trace_memory=True)
+        with profiler:
+            with metrics.phase('e-conomic login'):
+                pass
+            with metrics.phase('convert'):
+                pass
+            with metrics.phase('export'):
+                pass
+        self.assertEqual([snapshot[0] for snapshot in profiler.snapshots], ['after login', 'after submission'])
+        self.assertNotIn(profiler.on_phase, metrics.listeners)
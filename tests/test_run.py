@@ -0,0 +1,138 @@
+import datetime
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+from economicpy.fake_servers import FakeEconomicServer, FakeJiraServer, FakeOutlookServer
+from run import export, get_dates
+try:
+    import ConfigParser as configparser
+except ImportError:
+    import configparser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCalendarProviders(TestCase):
+    def run_python(self, statement):
+        return subprocess.check_output([sys.executable, '-c', statement], cwd=ROOT).decode().strip()
+
+    def test_calendar_providers_are_not_imported_with_run(self):
+        self.assertEqual(self.run_python(
+            "import sys, run; "
+            "print(sorted(name for name in sys.modules if name.startswith(('apiclient', 'economicpy.calendar_'))))"
+        ), '[]')
+
+    def test_only_selected_provider_is_imported(self):
+        self.assertEqual(self.run_python(
+            "import sys, run; calendar_class = run.get_calendar_class('Office365'); "
+            "print('%s %s' % (calendar_class.__name__, 'apiclient.discovery' in sys.modules))"
+        ), 'CalendarOutlook False')
+
+
+class TestGetDates(TestCase):
+    def test_single_date(self):
+        self.assertEqual([datetime.datetime(2016, 1, 31)], get_dates(date='2016-01-31'))
+
+    def test_date_range(self):
+        dates = get_dates(since='2016-01-30', until='2016-02-02')
+        self.assertEqual(['2016-01-30', '2016-01-31', '2016-02-01', '2016-02-02'],
+                         [date.isoformat()[:10] for date in dates])
+
+    def test_since_after_until(self):
+        self.assertEqual([], get_dates(since='2016-02-02', until='2016-01-30'))
+
+    def test_incorrect_date(self):
+        self.assertRaises(ValueError, get_dates, since='2016-13-01')
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.economic = FakeEconomicServer(size=2).start()
+        self.jira = FakeJiraServer(size=3).start()
+        self.outlook = FakeOutlookServer(size=4).start()
+        for server in (self.economic, self.jira, self.outlook):
+            self.addCleanup(server.stop)
+        self.dates = [datetime.datetime(1970, 1, 1)]
+
+    def get_config(self, password='secret'):
+        config = configparser.RawConfigParser()
+        config.read(os.path.join(ROOT, 'config.ini.dist'))
+        settings = {
+            'Economic': [('agreement', '1'), ('username', 'user'), ('password', password),
+                         ('default_project_id', '100'), ('description_format', '\n1 = {DEFAULT} - {CUSTOM}'),
+                         ('calendar_provider', 'Office365'), ('cache_dir', self.directory),
+                         ('reuse_session', 'no'), ('submit_workers', '2'), ('base_url', self.economic.url)],
+            'Jira': [('username', 'user'), ('password', 'secret'), ('economic_field', 'customfield_10000'),
+                     ('search_query', 'assignee=currentUser()'), ('api_url', self.jira.url + '/rest/api/2/'),
+                     ('default_activity_id', '1'), ('worklog_workers', '2'), ('retry_backoff', '0')],
+            'Office365': [('email', 'user@example.com'), ('password', 'secret'), ('default_activity_id', '1'),
+                          ('api_url', self.outlook.url + '/api/v1.0/'), ('cache_dir', self.directory)],
+        }
+        for section, items in settings.items():
+            for name, value in items:
+                config.set(section, name, value)
+
+        return config
+
+    def get_posted(self):
+        return sorted(entry['cs6'] for entry in self.economic.posted)
+
+
+class TestExport(ExportTestCase):
+    def test_export(self):
+        results = export(self.get_config(), self.directory, self.dates, False)
+        self.assertEqual([True] * 7, results)
+        self.assertEqual(['Activity 1 - Meeting %d' % index for index in range(4)] +
+                         ['FAKE-%d Issue %d' % (index, index) for index in range(3)], self.get_posted())
+        self.assertEqual(1, self.economic.count_requests('login'))
+
+    def test_export_date_range(self):
+        dates = get_dates(since='1970-01-01', until='1970-01-03')
+        results = export(self.get_config(), self.directory, dates, False)
+        self.assertEqual([True] * 7, results)
+        # Session and calendar view are shared by all days of range.
+        self.assertEqual(1, self.economic.count_requests('login'))
+        self.assertEqual(1, self.outlook.count_requests('calendarview'))
+        self.assertEqual(['1970-01-01'] * 4, [entry['cs1'] for entry in self.economic.posted
+                                              if entry['cs6'].startswith('Activity')])
+
+    def test_next_run_skips_registered_entries(self):
+        export(self.get_config(), self.directory, self.dates, False)
+        results = export(self.get_config(), self.directory, self.dates, False)
+        self.assertEqual([False] * 7, results)
+        self.assertEqual(7, len(self.economic.posted))
+
+    def test_dry_run(self):
+        results = export(self.get_config(), self.directory, self.dates, True)
+        self.assertEqual([True] * 7, results)
+        self.assertEqual([], self.economic.posted)
+
+    def test_export_in_fresh_interpreter(self):
+        # First strptime() calls are made at the same time from pipeline threads there.
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([ROOT, os.path.join(ROOT, 'tests'), env.get('PYTHONPATH', '')])
+        for _ in range(3):
+            process = subprocess.Popen([sys.executable, '-m', 'unittest', 'test_run.TestExport.test_export'],
+                                       cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            output = process.communicate()[0]
+            self.assertEqual(0, process.returncode, output)
+
+    def test_calendar_entries_are_added_when_jira_fails(self):
+        config = self.get_config()
+        # Nothing listens on port 1.
+        config.set('Jira', 'api_url', 'http://127.0.0.1:1/rest/api/2/')
+        with self.assertRaises(Exception) as context:
+            export(config, self.directory, self.dates, False)
+        self.assertTrue(str(context.exception).startswith('JIRA fetch: '), context.exception)
+        self.assertEqual(['Activity 1 - Meeting %d' % index for index in range(4)], self.get_posted())
+
+    def test_failed_login_is_raised(self):
+        with self.assertRaises(Exception) as context:
+            export(self.get_config(password='wrong'), self.directory, self.dates, False)
+        self.assertIn('login to economic failed', str(context.exception))
+        self.assertEqual([], self.economic.posted)
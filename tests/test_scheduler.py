@@ -0,0 +1,53 @@
+import sys
+import threading
+import time
+import traceback
+from unittest import TestCase
+from economicpy.scheduler import start_job
+try:
+    from thread import interrupt_main
+except ImportError:
+    from _thread import interrupt_main
+
+
+class TestScheduler(TestCase):
+    def test_jobs_run_at_the_same_time(self):
+        start = time.time()
+        jobs = [start_job('job %d' % i, time.sleep, 0.2) for i in range(3)]
+        for job in jobs:
+            job.get()
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_get_returns_result(self):
+        job = start_job('sum', sum, [1, 2, 3])
+        self.assertEqual(6, job.get())
+
+    def test_get_raises_error_of_job(self):
+        job = start_job('failing', int, 'not a number')
+        self.assertRaises(ValueError, job.get)
+
+    def test_get_raises_error_with_name_of_job_and_original_traceback(self):
+        def parse():
+            return int('not a number')
+
+        job = start_job('parsing', parse)
+        for _ in range(2):
+            try:
+                job.get()
+            except ValueError as e:
+                self.assertEqual("parsing: invalid literal for int() with base 10: 'not a number'", str(e))
+                self.assertEqual('parse', traceback.extract_tb(sys.exc_info()[2])[-1][2])
+            else:
+                self.fail('ValueError not raised')
+
+    def test_get_raises_system_exit_of_job(self):
+        job = start_job('exiting', sys.exit, 1)
+        self.assertRaises(SystemExit, job.get)
+
+    def test_waiting_for_job_can_be_interrupted(self):
+        job = start_job('sleeping', time.sleep, 10)
+        job.wait_timeout = 0.05
+        threading.Timer(0.1, interrupt_main).start()
+        start = time.time()
+        self.assertRaises(KeyboardInterrupt, job.get)
+        self.assertLess(time.time() - start, 2)